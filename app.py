@@ -3,11 +3,13 @@ from __future__ import annotations
 import os
 from flask import Flask, render_template
 
-from blueprints import api_bp
+from blueprints import FastJSONProvider, api_bp, covers_bp
 from config import FLASK_PORT, FLASK_ROOT, ENV_MODE, VERSION
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 app.register_blueprint(api_bp)
+app.register_blueprint(covers_bp)
 
 @app.context_processor
 def inject_flags():
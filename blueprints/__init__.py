@@ -1,4 +1,5 @@
-# blueprints/__init__.py
 from .api import bp as api_bp
+from .covers import bp as covers_bp
+from .json_provider import FastJSONProvider
 
-__all__ = ["api_bp"]
+__all__ = ["api_bp", "covers_bp", "FastJSONProvider"]
@@ -1,199 +1,262 @@
 # blueprints/api.py
 from __future__ import annotations
 
+import base64
+import csv
+import hashlib
+import io
 import json
-from typing import Any
-from flask import Blueprint, jsonify, request
-
-from scanner import normalize_code, fetch_book_with_fallback
-from stores.book_store import BookStore
+import os
+import shutil
+import tempfile
+from typing import Any, Iterator
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+
+from config import PER_PAGE, PROVIDER_DEADLINE
+from scanner import normalize_code, fetch_book_with_fallback, fetch_books_with_fallback
+from services.importer import IMPORT_FORMATS, count_records, detect_format, run_import
+from services.jobs import Job, get_queue
+from services.refresh import (
+    needs_refresh, refresh_one_book, run_refresh, store_writer, summarize_result,
+)
+from stores import open_store
+from stores.catalog import SUMMARY_FIELDS
+from stores.field_index import FILTER_FIELDS
+from stores.serializer import dumps
 
 bp = Blueprint("api", __name__, url_prefix="/api")
-store = BookStore.default()
+store = open_store()
+
+MAX_PER_PAGE = 200
+MAX_BATCH_CODES = 100
+MAX_FACET_VALUES = 100
+MAX_IMPORT_ERRORS = 1000  # failed records listed per import job (all are counted)
+
+EXPORT_CSV_COLUMNS = (
+    "id", "isbn", "isbn10", "isbn13", "title", "subtitle", "authors", "publishers",
+    "publish_date", "nb_pages", "language", "genres", "cover_image", "added_at", "updated_at",
+)
 
 
 # ---------------------------
 # Helpers
 # ---------------------------
 
-def _pick_str_or_first(v):
-    if isinstance(v, list):
-        for x in v:
-            if isinstance(x, str) and x.strip():
-                return x.strip()
-        return None
-    if isinstance(v, str) and v.strip():
-        return v.strip()
-    return None
+def _encode_cursor(key: list) -> str:
+    raw = json.dumps(key, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
 
 
-def _parse_refresh_opts(payload: dict | None) -> dict:
-    payload = payload or {}
-    return {
-        "debug": bool(payload.get("debug", False)),
-        "dry_run": bool(payload.get("dry_run", False)),
-        "only_missing": bool(payload.get("only_missing", False)),
-        "limit": payload.get("limit"),
-    }
+def _decode_cursor(cursor: str) -> list:
+    """
+    Raises ValueError on anything that isn't a cursor we handed out.
+    Listing cursors are [added_at, id]; search cursors are [offset].
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(raw)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}") from None
+    if isinstance(key, list) and len(key) == 2 and all(isinstance(x, str) for x in key):
+        return key
+    if isinstance(key, list) and len(key) == 1 and isinstance(key[0], int) and key[0] >= 0:
+        return key
+    raise ValueError("Invalid cursor")
 
 
-def _needs_refresh(book: dict) -> bool:
-    # tweak rules as you like
-    missing = (
-        not (book.get("title") or "").strip()
-        or not (book.get("authors") or [])
-        or not (book.get("publish_date") or "").strip()
-        or not (book.get("cover_image") or "").strip()
-        or not (book.get("language") or "").strip()
-    )
-    return bool(missing)
-
-def _refresh_items(
-    items: list[dict[str, Any]],
-    *,
-    debug: bool,
-    dry_run: bool,
-    only_missing: bool,
-) -> dict[str, Any]:
+def _parse_limit(raw: str | None, default: int = PER_PAGE, maximum: int = MAX_PER_PAGE) -> int:
+    # a missing or malformed limit falls back to the default
+    try:
+        limit = int(raw) if raw else default
+    except ValueError:
+        limit = default
+    return max(1, min(limit, maximum))
+
+
+def _parse_view(args) -> tuple[bool, list[str] | None]:
     """
-    Refresh a list of book JSON objects.
-    Returns a summary + per-item checklist-friendly arrays.
+    ?view=full|summary and ?fields=a,b,c for the listing endpoints.
+    Returns (summary, fields); fields=None means whole records. A fields list that
+    fits inside SUMMARY_FIELDS is served from the summary projection.
+    Raises ValueError on an unknown view.
     """
-    out: dict[str, Any] = {
-        "counts": {"updated": 0, "skipped": 0, "failed": 0},
-        "updated_items": [],
-        "skipped_items": [],
-        "failed_items": [],
-    }
+    view = (args.get("view") or "full").strip().lower()
+    if view not in ("full", "summary"):
+        raise ValueError("view must be 'full' or 'summary'.")
 
-    for cur in items:
-        item_id = cur.get("id") or "(no-id)"
-
-        if only_missing and not _needs_refresh(cur):
-            out["counts"]["skipped"] += 1
-            out["skipped_items"].append({
-                "id": item_id,
-                "isbn": _best_isbn(cur),
-                "title": cur.get("title"),
-                "subtitle": cur.get("subtitle"),
-                "sources": [s.get("provider") for s in (cur.get("sources") or []) if isinstance(s, dict) and s.get("provider")],
-                "reason": "not_missing",
-            })
-            continue
+    raw = (args.get("fields") or "").strip()
+    if not raw:
+        return view == "summary", None
+
+    fields = ["id"] + [f for f in (x.strip() for x in raw.split(",")) if f and f != "id"]
+    return view == "summary" or set(fields) <= set(SUMMARY_FIELDS), fields
 
-        res = _refresh_one_book(cur, debug=debug, dry_run=dry_run)
-
-        status = res.get("status")
-        if status in ("updated", "dry_run"):
-            out["counts"]["updated"] += 1
-            saved = res.get("saved") or res.get("book") or cur
-            out["updated_items"].append({
-                "id": (saved.get("id") or item_id),
-                "isbn": _best_isbn(saved),
-                "title": saved.get("title"),
-                "subtitle": saved.get("subtitle"),
-                "sources": _providers(saved),
-                "status": status,
-            })
-        elif status == "skipped":
-            out["counts"]["skipped"] += 1
-            out["skipped_items"].append({
-                "id": item_id,
-                "isbn": _best_isbn(cur),
-                "title": cur.get("title"),
-                "subtitle": cur.get("subtitle"),
-                "sources": _providers(cur),
-                "reason": res.get("reason") or "skipped",
-            })
-        else:
-            out["counts"]["failed"] += 1
-            out["failed_items"].append({
-                "id": item_id,
-                "isbn": _best_isbn(cur),
-                "title": cur.get("title"),
-                "subtitle": cur.get("subtitle"),
-                "sources": _providers(cur),
-                "error": res.get("error") or "refresh_failed",
-            })
-
-    return out
-
-def _refresh_one_book(cur: dict[str, Any], *, debug: bool, dry_run: bool) -> dict[str, Any]:
+
+def _parse_filters(args) -> dict[str, Any]:
     """
-    Refresh a single book based on best ISBN. Optionally dry-run.
-    Saves via store.upsert_book() unless dry_run.
+    ?author= &publisher= &genre= &language= (exact value, case/accent-insensitive)
+    and ?year_from= &year_to= (inclusive). Raises ValueError on a non-integer year.
     """
-    item_id = cur.get("id")
-    isbn = _best_isbn(cur)
-    if not isbn:
-        return {"status": "failed", "id": item_id, "error": "No ISBN available to refresh."}
+    filters: dict[str, Any] = {}
+    for name in FILTER_FIELDS:
+        value = (args.get(name) or "").strip()
+        if value:
+            filters[name] = value
+    for name in ("year_from", "year_to"):
+        raw = (args.get(name) or "").strip()
+        if raw:
+            try:
+                filters[name] = int(raw)
+            except ValueError:
+                raise ValueError(f"{name} must be a year.") from None
+    return filters
 
-    fresh = fetch_book_with_fallback(isbn, merge=True, debug=debug)
-    if not fresh:
-        return {"status": "failed", "id": item_id, "error": f"No provider data for ISBN {isbn}."}
 
-    if dry_run:
-        return {"status": "dry_run", "id": item_id, "book": fresh}
+def _project(items: list[dict[str, Any]], fields: list[str] | None) -> list[dict[str, Any]]:
+    if fields is None:
+        return items
+    return [{k: obj[k] for k in fields if k in obj} for obj in items]
 
-    saved = store.upsert_book(fresh)
-    return {"status": "updated", "id": saved.get("id") or item_id, "saved": saved}
 
+def _etag(*parts: Any) -> str:
+    raw = "\x1f".join(map(str, parts)).encode("utf-8")
+    return hashlib.blake2b(raw, digest_size=12).hexdigest()
 
-def _run_refresh(items: list[dict], *, debug: bool, dry_run: bool, only_missing: bool) -> dict:
-    updated = []
-    skipped = []
-    failed = []
 
-    for current in items:
-        if only_missing and not _needs_refresh(current):
-            skipped.append({"status": "skipped", "id": current.get("id"), "reason": "not_missing"})
-            continue
+def _not_modified(etag: str) -> Response | None:
+    """
+    304 response when the request's If-None-Match already names etag, else None.
+    Weak comparison (RFC 7232), so ETags a proxy weakened (W/"...") still match.
+    """
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    return _with_etag(Response(status=304), etag)
+
 
-        res = _refresh_one_book(current, debug=debug, dry_run=dry_run)
+def _with_etag(resp: Response, etag: str) -> Response:
+    # no-cache: clients keep the body but revalidate it on every use
+    resp.set_etag(etag)
+    resp.cache_control.no_cache = True
+    return resp
 
-        if res["status"] in ("updated", "dry_run"):
-            updated.append(res)
-        elif res["status"] == "skipped":
-            skipped.append(res)
-        else:
-            failed.append(res)
 
+def _parse_refresh_opts(payload: dict | None) -> dict:
+    payload = payload or {}
     return {
-        "updated": updated,
-        "skipped": skipped,
-        "failed": failed,
-        "counts": {"updated": len(updated), "skipped": len(skipped), "failed": len(failed)},
+        "debug": bool(payload.get("debug", False)),
+        "dry_run": bool(payload.get("dry_run", False)),
+        "only_missing": bool(payload.get("only_missing", False)),
+        "limit": payload.get("limit"),
     }
 
-def _best_isbn(book: dict[str, Any]) -> str | None:
+
+def _load_book(item_id: str) -> dict[str, Any] | None:
+    return store.get_item(item_id)
+
+def _export_ndjson(books: Iterator[dict]) -> Iterator[str]:
+    for book in books:
+        yield dumps(book, pretty=False) + "\n"
+
+
+def _join_values(v: Any) -> str:
     """
-    Prefer isbn13, then isbn10, then isbn.
+    "; "-joined CSV cell for a string-or-list field; non-string entries are dropped.
     """
-    ids = book.get("identifiers") or {}
-    for k in ("isbn13", "isbn10", "isbn"):
-        v = ids.get(k)
-        if isinstance(v, str) and v.strip():
-            return v.strip()
-    return None
-
-def _load_book_file(path):
-    return json.loads(path.read_text(encoding="utf-8"))
-
-def _providers(book: dict[str, Any]) -> list[str]:
-    srcs = book.get("sources") or []
-    out: list[str] = []
-    seen = set()
-    for s in srcs:
-        if not isinstance(s, dict):
-            continue
-        p = s.get("provider")
-        if not p:
-            continue
-        if p in seen:
+    if isinstance(v, str):
+        return v
+    if isinstance(v, list):
+        return "; ".join(x for x in v if isinstance(x, str))
+    return ""
+
+
+def _export_csv(books: Iterator[dict]) -> Iterator[str]:
+    buf = io.StringIO()
+    w = csv.writer(buf)
+
+    def flush() -> str:
+        out = buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+        return out
+
+    w.writerow(EXPORT_CSV_COLUMNS)
+    yield flush()
+
+    for book in books:
+        ids = book.get("identifiers") or {}
+        row = {
+            **{k: book.get(k) for k in EXPORT_CSV_COLUMNS},
+            "isbn": ids.get("isbn"),
+            "isbn10": ids.get("isbn10"),
+            "isbn13": ids.get("isbn13"),
+            "authors": _join_values(book.get("authors")),
+            "publishers": _join_values(book.get("publishers")),
+            "genres": _join_values(book.get("genres")),
+        }
+        w.writerow(["" if row[k] is None else row[k] for k in EXPORT_CSV_COLUMNS])
+        yield flush()
+
+
+def _import_job(job: Job, path: str, fmt: str, lookup: bool) -> None:
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        job.total = count_records(f, fmt)
+        f.seek(0)
+        run_import(
+            f,
+            fmt,
+            store,
+            lookup=lookup,
+            on_result=lambda res: job.record(
+                res, keep=res["status"] == "failed" and len(job.results) < MAX_IMPORT_ERRORS
+            ),
+            cancelled=lambda: job.cancel_requested,
+        )
+
+
+def _refresh_job(job: Job, opts: dict) -> None:
+    item_ids = store.item_ids()
+    if isinstance(opts["limit"], int) and opts["limit"] > 0:
+        item_ids = item_ids[: opts["limit"]]
+    job.total = len(item_ids)
+
+    items = []
+    for item_id in item_ids:
+        try:
+            book = _load_book(item_id)
+        except Exception as e:
+            job.record({"status": "failed", "id": item_id, "isbn": None, "title": None,
+                        "subtitle": None, "sources": [], "error": f"read_json: {e}"})
             continue
-        seen.add(p)
-        out.append(p)
-    return out
+        if book is not None:
+            items.append(book)
+
+    run_refresh(
+        items,
+        store,
+        debug=opts["debug"],
+        dry_run=opts["dry_run"],
+        only_missing=opts["only_missing"],
+        on_result=lambda res, cur: job.record(summarize_result(res, cur)),
+        cancelled=lambda: job.cancel_requested,
+    )
+
+
+def _migrate_job(job: Job) -> None:
+    store.migrate_layout(
+        on_moved=lambda item_id: job.record({"id": item_id}, bucket="moved", keep=False),
+        cancelled=lambda: job.cancel_requested,
+    )
+
+
+@bp.record_once
+def _start_layout_migration(state) -> None:
+    """
+    With LIBRARY_ITEMS_LAYOUT=sharded, move flat item files into shards in the
+    background (visible at GET /api/jobs/<id>). Books stay readable meanwhile.
+    """
+    if getattr(store, "sharded", False) and store.needs_migration():
+        job = get_queue().submit("migrate_items", _migrate_job, buckets=("moved",))
+        print(f"Migrating item files to the sharded layout (job {job.id})")
 
 
 # ---------------------------
@@ -232,6 +295,54 @@ def scan_lookup():
     return jsonify({"kind": kind, "value": value, "book": book, "error": None}), 200
 
 
+@bp.post("/scan/lookup/batch")
+def scan_lookup_batch():
+    """
+    {"codes": [...]} -> {"results": [...]} in input order, same shape as /scan/lookup
+    plus the raw "code". Duplicate codes are looked up once. Runs on the request
+    thread, so it's capped at MAX_BATCH_CODES and PROVIDER_DEADLINE; use
+    POST /api/books/import for bigger lists.
+    """
+    payload = request.get_json(silent=True) or {}
+    codes = payload.get("codes")
+    if not isinstance(codes, list) or not all(isinstance(c, str) for c in codes):
+        return jsonify({"error": "Missing or invalid 'codes' list."}), 400
+    if len(codes) > MAX_BATCH_CODES:
+        return jsonify({"error": f"Too many codes (max {MAX_BATCH_CODES})."}), 400
+
+    parsed = [normalize_code(c.strip()) for c in codes]
+    isbns = [p[1] for p in parsed if p and p[0] == "isbn"]
+    books = fetch_books_with_fallback(isbns, merge=True, debug=False, deadline_s=PROVIDER_DEADLINE)
+
+    results = []
+    counts = {"found": 0, "not_found": 0, "unsupported": 0}
+    for raw, p in zip(codes, parsed):
+        if not p:
+            counts["unsupported"] += 1
+            results.append({"code": raw, "kind": None, "value": None, "book": None,
+                            "error": "Unsupported code. Expected ISBN-10/13 or ASIN."})
+            continue
+
+        kind, value = p
+        if kind == "asin":
+            counts["unsupported"] += 1
+            results.append({"code": raw, "kind": kind, "value": value, "book": None,
+                            "error": "ASIN detected. No supported provider yet. Skipping."})
+            continue
+
+        book = books.get(value)
+        counts["found" if book else "not_found"] += 1
+        results.append({
+            "code": raw,
+            "kind": kind,
+            "value": value,
+            "book": book,
+            "error": None if book else "No result from OpenLibrary/Google Books for this ISBN.",
+        })
+
+    return jsonify({"results": results, "counts": counts}), 200
+
+
 @bp.post("/books")
 def books_create():
     payload = request.get_json(silent=True) or {}
@@ -245,84 +356,203 @@ def books_create():
 
 @bp.get("/books")
 def books_list():
-    q = (request.args.get("q") or "").strip().lower()
-
-    items = []
-    for p in store.items_dir.glob("*.json"):
+    """
+    Without q: newest first, keyset-paginated on (added_at, id).
+    With q: full-text search, best match first.
+    ?limit= (default PER_PAGE) &cursor= (next_cursor from the previous page) &q=
+    ?view=summary returns SUMMARY_FIELDS only, straight from memory;
+    ?fields=title,authors,... picks top-level fields (id is always included).
+    ?author= &publisher= &genre= &language= &year_from= &year_to= filter either
+    mode through the catalog's posting lists; non-matching items are never read.
+
+    The ETag covers the store generation and the query, so an unchanged
+    library answers If-None-Match with 304 before any page is built.
+    """
+    q = (request.args.get("q") or "").strip()
+    limit = _parse_limit(request.args.get("limit"))
+    try:
+        summary, fields = _parse_view(request.args)
+        filters = _parse_filters(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    cursor = None
+    raw_cursor = (request.args.get("cursor") or "").strip()
+    if raw_cursor:
         try:
-            items.append(p)
-        except Exception:
-            continue
+            cursor = _decode_cursor(raw_cursor)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if len(cursor) != (1 if q else 2):
+            return jsonify({"error": "Cursor does not belong to this query."}), 400
+
+    etag = _etag(store.generation(), sorted(request.args.items(multi=True)))
+    not_modified = _not_modified(etag)
+    if not_modified:
+        return not_modified
+
+    if q:
+        offset = cursor[0] if cursor else 0
+        items, total = store.search(q, limit, offset, summary=summary, filters=filters)
+        end = offset + limit
+        return _with_etag(jsonify({
+            "items": _project(items, fields),
+            "count": len(items),
+            "total": total,
+            "next_cursor": _encode_cursor([end]) if end < total else None,
+        }), etag)
+
+    items, next_key = store.list_page(limit, tuple(cursor) if cursor else None, summary=summary, filters=filters)
+    return _with_etag(jsonify({
+        "items": _project(items, fields),
+        "count": len(items),
+        "next_cursor": _encode_cursor(list(next_key)) if next_key else None,
+    }), etag)
+
+
+@bp.post("/books/import")
+def books_import():
+    """
+    Bulk import from an uploaded file (multipart field "file") or the raw request body:
+    - ndjson: one book object per line (e.g. a /books/export dump)
+    - csv: ISBNs, from an isbn/code column or the first column
+    ?format= overrides detection from the filename / Content-Type.
+    ?lookup=0 stores CSV ISBNs as identifier-only stubs instead of querying providers.
+
+    The upload is spooled to disk and imported by a background job (202 + job_id);
+    poll GET /api/jobs/<id> for progress. Only failed records are listed in results
+    (the first MAX_IMPORT_ERRORS).
+    """
+    upload = request.files.get("file")
+    src = upload.stream if upload else request.stream
 
-    # Load + simple search
-    out = []
-    for p in items:
-        try:
-            obj = __import__("json").loads(p.read_text(encoding="utf-8"))
-        except Exception:
-            continue
+    fmt = (request.args.get("format") or "").strip().lower() or detect_format(
+        upload.filename if upload else None,
+        upload.mimetype if upload else request.mimetype,
+    )
+    if fmt not in IMPORT_FORMATS:
+        return jsonify({"error": "Unsupported or unknown format. Expected ndjson or csv."}), 400
+
+    lookup = (request.args.get("lookup") or "1").strip().lower() not in ("0", "false", "no")
 
-        if q:
-            hay = f"{obj.get('title','')} {' '.join(obj.get('authors',[]))}".lower()
-            if q not in hay:
-                continue
-        out.append(obj)
+    fd, path = tempfile.mkstemp(prefix="import-", suffix=f".{fmt}")
+    with os.fdopen(fd, "wb") as out:
+        shutil.copyfileobj(src, out, 1024 * 1024)
 
-    # default sort: newest first
-    out.sort(key=lambda x: x.get("added_at") or "", reverse=True)
-    return jsonify({"items": out, "count": len(out)}), 200
+    job = get_queue().submit(
+        "import",
+        lambda job: _import_job(job, path, fmt, lookup),
+        buckets=("imported", "failed"),
+        # runs even when the job is cancelled before it starts
+        cleanup=lambda: os.unlink(path),
+    )
+    return jsonify({"job_id": job.id, "status": job.status}), 202
+
+
+@bp.get("/books/export")
+def books_export():
+    """
+    Stream the whole library, one record at a time (chunked transfer encoding).
+    ?format=ndjson (default, full documents) | csv (flat columns)
+    """
+    fmt = (request.args.get("format") or "ndjson").strip().lower()
+    if fmt == "ndjson":
+        body, mimetype = _export_ndjson(store.iter_snapshot()), "application/x-ndjson"
+    elif fmt == "csv":
+        body, mimetype = _export_csv(store.iter_snapshot()), "text/csv"
+    else:
+        return jsonify({"error": "Unsupported format. Expected ndjson or csv."}), 400
+
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="library.{fmt}"'},
+    )
+
+
+@bp.get("/facets")
+def facets_get():
+    """
+    Counts per genre, language, publisher and decade, most frequent first:
+    {"genre": [{"value", "count"}, ...], ...}. Library-wide by default; ?q= and
+    the GET /books filters scope the counts to matching books.
+    ?limit= values per facet (default 20, max MAX_FACET_VALUES).
+    """
+    q = (request.args.get("q") or "").strip()
+    try:
+        filters = _parse_filters(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    limit = _parse_limit(request.args.get("limit"), 20, MAX_FACET_VALUES)
+
+    etag = _etag(store.generation(), "facets", sorted(request.args.items(multi=True)))
+    not_modified = _not_modified(etag)
+    if not_modified:
+        return not_modified
+
+    return _with_etag(jsonify(store.facets(q, filters, limit)), etag)
 
 
 @bp.get("/books/<item_id>")
 def books_get(item_id: str):
-    p = store.items_dir / f"{item_id}.json"
-    if not p.exists():
+    """
+    One book. Its ETag comes from the store's per-item version, so a matching
+    If-None-Match gets a 304 without the item being read.
+    """
+    version = store.item_version(item_id)
+    if version is None:
+        return jsonify({"error": "Not found"}), 404
+
+    etag = _etag(item_id, version)
+    not_modified = _not_modified(etag)
+    if not_modified:
+        return not_modified
+
+    obj = store.get_item(item_id)
+    if obj is None:
         return jsonify({"error": "Not found"}), 404
 
-    obj = __import__("json").loads(p.read_text(encoding="utf-8"))
-    return jsonify(obj), 200
+    return _with_etag(jsonify(obj), etag)
 
 
 @bp.post("/books/refresh")
 def books_refresh_all():
+    """
+    Queue a refresh of the whole library and return its job id right away (202).
+    Poll GET /api/jobs/<id> for progress.
+    """
     payload = request.get_json(silent=True) or {}
     opts = _parse_refresh_opts(payload)
 
-    files = sorted(store.items_dir.glob("*.json"))
-    if isinstance(opts["limit"], int) and opts["limit"] > 0:
-        files = files[: opts["limit"]]
+    job = get_queue().submit(
+        "refresh",
+        lambda job: _refresh_job(job, opts),
+        buckets=("updated", "unchanged", "skipped", "failed"),
+    )
+    return jsonify({"job_id": job.id, "status": job.status}), 202
 
-    items = []
-    read_failed = []
 
-    for p in files:
-        try:
-            items.append(_load_book_file(p))
-        except Exception as e:
-            read_failed.append({"id": p.stem, "error": f"read_json: {e}"})
+@bp.get("/jobs/<job_id>")
+def jobs_get(job_id: str):
+    job = get_queue().get(job_id)
+    if job is None:
+        return jsonify({"error": "Not found"}), 404
 
-    result = _run_refresh(
-        items,
-        debug=opts["debug"],
-        dry_run=opts["dry_run"],
-        only_missing=opts["only_missing"],
-    )
+    try:
+        since = max(0, int(request.args.get("since") or 0))
+    except ValueError:
+        since = 0
+    return jsonify(job.to_dict(since)), 200
 
-    if read_failed:
-        result["read_failed"] = read_failed
-        result["counts"]["failed"] += len(read_failed)
-        # also mirror into failed_items for UI consistency
-        for rf in read_failed:
-            result["failed_items"].append({
-                "id": rf.get("id"),
-                "isbn": None,
-                "title": None,
-                "subtitle": None,
-                "sources": [],
-                "error": rf.get("error"),
-            })
-            
-    return jsonify(result), 200
+
+@bp.post("/jobs/<job_id>/cancel")
+def jobs_cancel(job_id: str):
+    job = get_queue().get(job_id)
+    if job is None:
+        return jsonify({"error": "Not found"}), 404
+
+    job.cancel()
+    return jsonify(job.to_dict(len(job.results))), 200
 
 
 @bp.post("/books/<item_id>/refresh")
@@ -330,18 +560,17 @@ def books_refresh_one(item_id: str):
     payload = request.get_json(silent=True) or {}
     opts = _parse_refresh_opts(payload)
 
-    p = store.items_dir / f"{item_id}.json"
-    if not p.exists():
-        return jsonify({"error": "Not found"}), 404
-
     try:
-        current = _load_book_file(p)
+        current = _load_book(item_id)
     except Exception as e:
         return jsonify({"error": f"Failed to read book JSON: {e}"}), 500
 
-    if opts["only_missing"] and not _needs_refresh(current):
+    if current is None:
+        return jsonify({"error": "Not found"}), 404
+
+    if opts["only_missing"] and not needs_refresh(current):
         return jsonify({"status": "skipped", "id": item_id, "reason": "not_missing"}), 200
 
-    res = _refresh_one_book(current, debug=opts["debug"], dry_run=opts["dry_run"])
-    code = 200 if res["status"] in ("updated", "dry_run", "skipped") else 502
+    res = refresh_one_book(current, store_writer(store), debug=opts["debug"], dry_run=opts["dry_run"])
+    code = 200 if res["status"] in ("updated", "unchanged", "dry_run", "skipped") else 502
     return jsonify(res), code
\ No newline at end of file
@@ -0,0 +1,34 @@
+# blueprints/covers.py
+from __future__ import annotations
+
+from flask import Blueprint, abort, send_file
+
+from config import TTL_THUMBS
+from services.covers import THUMB_SIZES, CoverCache
+from .api import store
+
+bp = Blueprint("covers", __name__, url_prefix="/covers")
+covers = CoverCache(store.data_root / "covers")
+store.subscribe(covers.prefetch)
+
+# Browser cache lifetime when thumbnails never expire server-side
+DEFAULT_MAX_AGE = 7 * 24 * 3600
+
+
+@bp.get("/<item_id>/<size>")
+def cover_get(item_id: str, size: str):
+    if size not in THUMB_SIZES:
+        abort(404)
+
+    book = store.get_item(item_id)
+    url = (book or {}).get("cover_image")
+    if not url:
+        abort(404)
+
+    found = covers.thumbnail(item_id, size, url)
+    if not found:
+        abort(404)
+
+    path, mimetype = found
+    # send_file answers If-None-Match / If-Modified-Since with 304 from the file's mtime+size ETag
+    return send_file(path, mimetype=mimetype, etag=True, conditional=True, max_age=TTL_THUMBS or DEFAULT_MAX_AGE)
@@ -0,0 +1,36 @@
+# blueprints/json_provider.py
+from __future__ import annotations
+from typing import Any
+
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+
+from stores.serializer import dumps, dumps_bytes, loads
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by stores.serializer (orjson when installed).
+    Responses are UTF-8 with keys in document order; output is indented
+    only in debug mode, as with Flask's default provider.
+    Calls with stdlib-specific kwargs (indent=, cls=, ...) go to the default provider.
+    """
+
+    ensure_ascii = False
+    sort_keys = False
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps(obj, pretty=False, sort_keys=self.sort_keys, default=self.default)
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        data = dumps_bytes(obj, pretty=pretty, sort_keys=self.sort_keys, default=self.default)
+        return self._app.response_class(data + b"\n", mimetype=self.mimetype)
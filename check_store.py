@@ -0,0 +1,99 @@
+# check_store.py
+"""
+Stress check for BookStore's write lock, group commit and compaction:
+several processes x threads upsert into one temporary data_root, then the
+index, the merged fields and the item files are verified.
+
+    python check_store.py [--durability async|commit|fsync] [--processes 4] [--books 150]
+"""
+import argparse
+import multiprocessing as mp
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import stores.book_store as book_store
+from stores import BookStore
+
+THREADS = 3
+SHARED_BOOKS = 20  # books every writer merges its own field into
+BATCH_BOOKS = 50
+MANY_BOOKS = 300  # > SNAPSHOT_COMMIT_MIN: committed with a snapshot rewrite
+
+
+def _worker(data_root: str, w: int, n: int, durability: str) -> None:
+    # compact every few KB of log so compaction races the other writers
+    book_store.COMPACT_LOG_BYTES = 4096
+    store = BookStore(Path(data_root), durability=durability)
+
+    def run(t: int) -> None:
+        for i in range(n):
+            store.upsert_book({"identifiers": {"isbn": f"978{w}{t}{i:07d}0"}, "title": f"W{w} {i}"})
+            store.upsert_book({"identifiers": {"isbn": f"97899{i % SHARED_BOOKS:08d}"}, f"f{w}_{t}": i})
+        if t == 0:
+            with store.batch():
+                for i in range(BATCH_BOOKS):
+                    store.upsert_book({"identifiers": {"isbn": f"977{w}{i:08d}"}, "title": "batch"})
+            store.upsert_many([{"identifiers": {"isbn": f"976{w}{i:08d}"}, "title": "many"} for i in range(MANY_BOOKS)])
+
+    threads = [threading.Thread(target=run, args=(t,)) for t in range(THREADS)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    # multiprocessing workers skip atexit: commit a pending "async" group now
+    store.flush()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--durability", default="commit", choices=book_store.DURABILITY_MODES)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--books", type=int, default=150, help="books per thread")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_root:
+        started = time.time()
+        procs = [
+            mp.Process(target=_worker, args=(data_root, w, args.books, args.durability))
+            for w in range(args.processes)
+        ]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        elapsed = time.time() - started
+
+        store = BookStore(Path(data_root))
+        problems = [f"worker exited with {p.exitcode}" for p in procs if p.exitcode]
+
+        expected = args.processes * (THREADS * args.books + BATCH_BOOKS + MANY_BOOKS) + SHARED_BOOKS
+        entries = len(store._load_index()["by_identifier"])
+        files = sum(1 for item_id in store.item_ids() if store.get_item(item_id) is not None)
+        if entries != expected:
+            problems.append(f"{entries} index entries, expected {expected}")
+        if files != expected:
+            problems.append(f"{files} readable items, expected {expected}")
+
+        missing = 0
+        for i in range(SHARED_BOOKS):
+            book = store.get_by_identifier("isbn", f"97899{i:08d}") or {}
+            missing += sum(1 for w in range(args.processes) for t in range(THREADS) if f"f{w}_{t}" not in book)
+        if missing:
+            problems.append(f"{missing} merged fields lost on shared books")
+
+        leftovers = len(list(Path(data_root).rglob("*.tmp")))
+        if leftovers:
+            problems.append(f"{leftovers} temporary files left behind")
+
+    print(f"{expected} books, {args.processes} processes x {THREADS} threads, {args.durability}: {elapsed:.1f}s")
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    print("OK" if not problems else f"{len(problems)} problem(s)")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
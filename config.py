@@ -14,9 +14,52 @@ FLASK_PORT = int(os.getenv("FLASK_PORT", 5000))
 FLASK_ROOT = os.getenv("FLASK_ROOT", "")
 PER_PAGE = int(os.getenv("DEFAULT_PER_PAGE", "20"))
 
+# Storage backend: "json" (data/items/*.json + index) or "sqlite" (data/library.sqlite3)
+STORE_BACKEND = os.getenv("LIBRARY_STORE_BACKEND", "json")
+# Item files: "flat" (data/items/<id>.json) or "sharded" (data/items/ab/cd/<id>.json, for very large libraries)
+ITEMS_LAYOUT = os.getenv("LIBRARY_ITEMS_LAYOUT", "flat").strip().lower()
+# Indent stored JSON (items, index, caches) for debugging; compact otherwise
+JSON_PRETTY = os.getenv("LIBRARY_JSON_PRETTY", "0").strip().lower() in ("1", "true", "yes")
+# Group commit (json backend): concurrent upserts share one index log append; with "async" durability,
+# upserts within this window do. 0 = commit each upsert on its own
+COMMIT_WINDOW_MS = float(os.getenv("LIBRARY_COMMIT_WINDOW_MS", "10"))
+# When an upsert returns: "async" (before its group commits), "commit" (after), "fsync" (after, flushed to disk)
+COMMIT_DURABILITY = os.getenv("LIBRARY_COMMIT_DURABILITY", "commit").strip().lower()
+
+# Provider HTTP client (Open Library / Google Books)
+HTTP_POOL_SIZE = int(os.getenv("PROVIDER_POOL_SIZE", "10"))  # keep-alive connections per host
+HTTP_RETRIES = int(os.getenv("PROVIDER_RETRIES", "3"))
+HTTP_BACKOFF = float(os.getenv("PROVIDER_BACKOFF_SECONDS", "0.5"))  # exponential backoff factor
+HTTP_MAX_RETRY_AFTER = float(os.getenv("PROVIDER_MAX_RETRY_AFTER_SECONDS", "10"))  # cap on a 429/503 Retry-After wait
+PROVIDER_DEADLINE = float(os.getenv("PROVIDER_DEADLINE_SECONDS", "10"))  # per provider, parallel lookups
+PROVIDER_FANOUT_WORKERS = int(os.getenv("PROVIDER_FANOUT_WORKERS", "8"))
+PROVIDER_BATCH_WORKERS = int(os.getenv("PROVIDER_BATCH_WORKERS", "4"))  # Google fan-out for batch lookups/refreshes
+OPENLIB_BATCH_SIZE = int(os.getenv("OPENLIBRARY_BATCH_SIZE", "50"))  # ISBNs per bibkeys request
+# Max requests/second per provider host (0 = unlimited)
+PROVIDER_RATE_LIMITS = {
+    "openlibrary.org": float(os.getenv("OPENLIBRARY_MAX_RPS", "5")),
+    "www.googleapis.com": float(os.getenv("GOOGLE_BOOKS_MAX_RPS", "5")),
+    "covers.openlibrary.org": float(os.getenv("OPENLIBRARY_COVERS_MAX_RPS", "2")),
+}
+
+# Library refresh
+REFRESH_CONCURRENCY = int(os.getenv("REFRESH_CONCURRENCY", "4"))  # books refreshed at once
+
+# Background jobs (in-process)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))  # jobs run at once
+JOB_KEEP = int(os.getenv("JOB_KEEP", "50"))  # finished jobs kept for polling
+
+# Bulk import
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "500"))  # records per store batch
+
 # TTL (seconds). 0 or missing = never expire.
 TTL_THUMBS = int(os.getenv("IMMICH_THUMB_TTL_SECONDS", "0") or "0")
 TTL_META = int(os.getenv("IMMICH_META_TTL_SECONDS", "300") or "300")  # 5 min default
+TTL_META_NEGATIVE = int(os.getenv("META_NEGATIVE_TTL_SECONDS", str(TTL_META)) or "0")  # "not found" answers
+META_CACHE_MAX_BYTES = int(os.getenv("META_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))  # 0 = unbounded
+COVER_PREFETCH_WORKERS = int(os.getenv("COVER_PREFETCH_WORKERS", "2"))
+COVER_PREFETCH_BACKLOG = int(os.getenv("COVER_PREFETCH_BACKLOG", "100"))  # queued prefetches; more are skipped
+TTL_COVER_MISSING = int(os.getenv("COVER_MISSING_TTL_SECONDS", str(24 * 3600)) or "0")  # placeholder/failed covers
 
 # Paths for saving outputs
 BASE_DIR = Path(os.getenv("LIBRARY_DATA_DIR", "data")).resolve()
@@ -0,0 +1,5 @@
+from .http_client import ProviderClient, get_client
+from .meta_cache import MetaCache, get_meta_cache
+from .rate_limit import RateLimiter
+
+__all__ = ["MetaCache", "ProviderClient", "RateLimiter", "get_client", "get_meta_cache"]
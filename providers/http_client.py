@@ -0,0 +1,137 @@
+# providers/http_client.py
+from __future__ import annotations
+import threading
+import time
+from typing import Any
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import HTTP_BACKOFF, HTTP_MAX_RETRY_AFTER, HTTP_POOL_SIZE, HTTP_RETRIES, PROVIDER_RATE_LIMITS, VERSION
+from providers.rate_limit import RateLimiter
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class CappedRetry(Retry):
+    """
+    Retry that honours Retry-After but never sleeps longer than max_retry_after,
+    so one 429 can't park a worker thread for minutes.
+    """
+
+    max_retry_after = HTTP_MAX_RETRY_AFTER
+
+    def get_retry_after(self, response) -> float | None:
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, self.max_retry_after)
+
+
+class ProviderClient:
+    """
+    Keep-alive HTTP client shared by all provider fetchers.
+
+    One HTTPAdapter (and so one urllib3 pool per host) is shared by every
+    thread; each thread gets its own lightweight Session mounted on it, since
+    Session objects themselves are not thread-safe.
+
+    rate_limits maps a host to the max requests/second sent to it.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = HTTP_POOL_SIZE,
+        retries: int = HTTP_RETRIES,
+        backoff: float = HTTP_BACKOFF,
+        rate_limits: dict[str, float] | None = None,
+    ) -> None:
+        retry = CappedRetry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        self._adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_size, max_retries=retry)
+        # single attempts for deadline-bound calls, which retry by hand; see get()
+        self._once_adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_size, max_retries=0)
+        self.retries = retries
+        self.backoff = backoff
+        self._local = threading.local()
+        self.headers = {"User-Agent": f"sanctum-library/{VERSION or 'dev'}"}
+        limits = PROVIDER_RATE_LIMITS if rate_limits is None else rate_limits
+        self._limiters = {host: RateLimiter(rate) for host, rate in limits.items()}
+
+    def session(self, once: bool = False) -> requests.Session:
+        name = "once_session" if once else "session"
+        s = getattr(self._local, name, None)
+        if s is None:
+            adapter = self._once_adapter if once else self._adapter
+            s = requests.Session()
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            s.headers.update(self.headers)
+            setattr(self._local, name, s)
+        return s
+
+    def get(self, url: str, deadline: float | None = None, **kwargs: Any) -> requests.Response:
+        """
+        GET with retries and the host's rate limit. With `deadline` (a
+        time.monotonic() value) the whole call, rate-limit waits and retries
+        included, ends by then or raises requests.Timeout, so a lookup the
+        caller stopped waiting for doesn't keep a worker busy.
+        """
+        limiter = self._limiters.get(urlsplit(url).hostname or "")
+        if deadline is not None:
+            return self._get_within(url, deadline, limiter, **kwargs)
+        if limiter:
+            limiter.acquire()
+        return self.session().get(url, **kwargs)
+
+    def _get_within(self, url: str, deadline: float, limiter: RateLimiter | None, **kwargs: Any) -> requests.Response:
+        timeout = kwargs.pop("timeout", None)
+        attempt = 0
+        last = None
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or (limiter and not limiter.acquire(max_wait=remaining)):
+                if last is not None:
+                    return last
+                raise requests.Timeout(f"Deadline passed before requesting {url}")
+            remaining = max(0.1, deadline - time.monotonic())
+            try:
+                last = self.session(once=True).get(url, timeout=min(timeout or remaining, remaining), **kwargs)
+                if last.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                    return last
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.retries or deadline - time.monotonic() <= 0:
+                    raise
+            time.sleep(max(0.0, min(self.backoff * 2 ** attempt, deadline - time.monotonic())))
+            attempt += 1
+
+    def close(self) -> None:
+        self._adapter.close()
+        self._once_adapter.close()
+
+
+_client: ProviderClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> ProviderClient:
+    """
+    Process-wide ProviderClient, created on first use.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = ProviderClient()
+    return _client
@@ -0,0 +1,121 @@
+# providers/meta_cache.py
+from __future__ import annotations
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from config import META_CACHE_MAX_BYTES, META_DIR, TTL_META, TTL_META_NEGATIVE
+from stores.serializer import dumps_bytes, loads
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+class MetaCache:
+    """
+    On-disk cache of raw provider responses, one file per (provider, key):
+    META_DIR/<provider>/<key>.json = {"fetched_at", "found", "body"}.
+
+    - TTL expiry (0 = never expire); not-found answers use their own TTL
+    - LRU eviction once the cache grows past max_bytes (hits bump the file mtime)
+    """
+
+    def __init__(
+        self,
+        root: Path = META_DIR,
+        ttl: int = TTL_META,
+        negative_ttl: int = TTL_META_NEGATIVE,
+        max_bytes: int = META_CACHE_MAX_BYTES,
+    ) -> None:
+        self.root = Path(root)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_bytes = max_bytes
+        self._size: int | None = None  # running total, measured lazily
+        self._lock = threading.Lock()
+
+    def _path(self, provider: str, key: str) -> Path:
+        return self.root / _UNSAFE.sub("_", provider) / f"{_UNSAFE.sub('_', key)}.json"
+
+    def get(self, provider: str, key: str) -> tuple[bool, Any] | None:
+        """
+        (found, body) when a fresh entry exists, else None.
+        """
+        p = self._path(provider, key)
+        try:
+            entry = loads(p.read_bytes())
+        except (FileNotFoundError, ValueError):
+            return None
+
+        found = bool(entry.get("found"))
+        ttl = self.ttl if found else self.negative_ttl
+        if ttl and time.time() - float(entry.get("fetched_at") or 0) > ttl:
+            return None
+
+        try:
+            os.utime(p)
+        except OSError:
+            pass
+        return found, entry.get("body")
+
+    def put(self, provider: str, key: str, body: Any, found: bool) -> None:
+        p = self._path(provider, key)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        data = dumps_bytes({"fetched_at": time.time(), "found": found, "body": body})
+
+        tmp = p.with_suffix(f".json.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, p)
+
+        if self.max_bytes <= 0:
+            return
+        with self._lock:
+            if self._size is None:
+                self._size = sum(f.stat().st_size for f in self.root.glob("*/*.json"))
+            else:
+                self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """
+        Drop least recently used entries until the cache is back under 90% of max_bytes.
+        """
+        files = []
+        for f in self.root.glob("*/*.json"):
+            try:
+                st = f.stat()
+            except FileNotFoundError:
+                continue
+            files.append((st.st_mtime, st.st_size, f))
+        files.sort()
+
+        total = sum(size for _, size, _ in files)
+        target = int(self.max_bytes * 0.9)
+        for _, size, f in files:
+            if total <= target:
+                break
+            try:
+                f.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._size = total
+
+
+_cache: MetaCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_meta_cache() -> MetaCache:
+    """
+    Process-wide MetaCache, created on first use.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = MetaCache()
+    return _cache
@@ -0,0 +1,33 @@
+# providers/rate_limit.py
+from __future__ import annotations
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Spaces calls at least 1/rate seconds apart, across all threads.
+    rate <= 0 disables limiting.
+    """
+
+    def __init__(self, rate: float) -> None:
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, max_wait: float | None = None) -> bool:
+        """
+        Wait for a slot. With max_wait, gives up (False, no slot taken) when
+        the wait would be longer.
+        """
+        if not self.interval:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            if max_wait is not None and wait > max_wait:
+                return False
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+        return True
@@ -1,6 +1,6 @@
 # scan_books.py
 from scanner import detect_scanner, listen_scanner, fetch_book_with_fallback
-from stores.book_store import BookStore
+from stores import open_store
 
 def main():
     status = detect_scanner()
@@ -9,7 +9,7 @@ def main():
         for c in status.candidates[:8]:
             print(f"  - {c}")
 
-    store = BookStore.default()
+    store = open_store()
     print(f"Data dir: {store.data_root}")
     print("Ready. Ctrl+C to exit.")
 
@@ -1,17 +1,27 @@
 # scanner.py
 from __future__ import annotations
 import re
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from datetime import datetime
 from typing import Any
 from pathlib import Path
 
 from models.scanner_status import ScannerStatus, detect_scanner
+from providers import get_client, get_meta_cache
+from config import OPENLIB_BATCH_SIZE, PROVIDER_BATCH_WORKERS, PROVIDER_DEADLINE, PROVIDER_FANOUT_WORKERS
 
 # Variables
 OPENLIB_BOOKS_API = "https://openlibrary.org/api/books"
 GOOGLE_BOOKS_API = "https://www.googleapis.com/books/v1/volumes"
 
+# Interactive scan lookups (fetch_book_with_fallback)
+_fanout_pool = ThreadPoolExecutor(max_workers=PROVIDER_FANOUT_WORKERS, thread_name_prefix="provider")
+# Batch lookups (fetch_books_with_fallback): a rate-limited Google backlog from an
+# import or refresh must never queue ahead of a scan's lookups
+_batch_pool = ThreadPoolExecutor(max_workers=PROVIDER_BATCH_WORKERS, thread_name_prefix="provider-batch")
+
 
 # ========== Helpers ==========
 
@@ -78,28 +88,73 @@ def format_publish_date(publish_date: str | None) -> str | None:
 
 # ========== Fetching ==========
 
-def fetch_openlibrary_book(isbn: str, timeout_s: int = 10, debug: bool = False,) -> dict[str, Any] | None:
+def _fetch_provider_json(
+    provider: str,
+    label: str,
+    isbn: str,
+    url: str,
+    params: dict[str, Any],
+    timeout_s: int,
+    debug: bool,
+    is_found,
+    deadline: float | None = None,
+) -> Any | None:
     """
-    Returns normalized dict or None if not found.
+    Raw provider JSON for one ISBN, served from the meta cache while fresh.
+    Successful answers (found or not) are cached; request failures are not.
+    With deadline (time.monotonic()), the request and its retries end by then.
     """
-    params = {"bibkeys": f"ISBN:{isbn}", "format": "json", "jscmd": "data"}
+    cache = get_meta_cache()
+    hit = cache.get(provider, isbn)
+    if hit is not None:
+        if debug:
+            print(f"---- {label} cached response (found={hit[0]}) ----")
+        return hit[1]
+
     try:
-        r = requests.get(OPENLIB_BOOKS_API, params=params, timeout=timeout_s)
+        r = get_client().get(url, params=params, timeout=timeout_s, deadline=deadline)
         if debug:
-            print("---- OpenLibrary raw response ----")
+            print(f"---- {label} raw response ----")
             print(r.text)
             print("---- end response ----")
         r.raise_for_status()
-    except requests.RequestException as e:
-        print(f"Open Library request failed: {e}")
+        data = r.json()
+    except (requests.RequestException, ValueError) as e:
+        print(f"{label} request failed: {e}")
         return None
 
-    data = r.json()
+    cache.put(provider, isbn, data, found=bool(is_found(data)))
+    return data
+
+
+def fetch_openlibrary_book(
+    isbn: str,
+    timeout_s: int = 10,
+    debug: bool = False,
+    deadline: float | None = None,
+) -> dict[str, Any] | None:
+    """
+    Returns normalized dict or None if not found.
+    """
     key = f"ISBN:{isbn}"
+    params = {"bibkeys": key, "format": "json", "jscmd": "data"}
+    data = _fetch_provider_json(
+        "openlibrary", "Open Library", isbn, OPENLIB_BOOKS_API, params, timeout_s, debug,
+        is_found=lambda d: isinstance(d, dict) and d.get(key),
+        deadline=deadline,
+    )
+    if not isinstance(data, dict):
+        return None
+
     b: dict = data.get(key)
     if not b:
         return None
-    
+    return _normalize_openlibrary(isbn, b)
+
+
+def _normalize_openlibrary(isbn: str, b: dict[str, Any]) -> dict[str, Any]:
+    key = f"ISBN:{isbn}"
+
     # OpenLibrary can sometimes provide cover links too; keep canonical cover fallback
     cover = None
     if isinstance(b.get("cover"), dict):
@@ -167,26 +222,28 @@ def fetch_openlibrary_book(isbn: str, timeout_s: int = 10, debug: bool = False,)
     return resp
 
 
-def fetch_google_books(isbn: str, timeout_s: int = 10, debug: bool = False) -> dict[str, Any] | None:
+def fetch_google_books(
+    isbn: str,
+    timeout_s: int = 10,
+    debug: bool = False,
+    deadline: float | None = None,
+) -> dict[str, Any] | None:
     params = {"q": f"isbn:{isbn}"}
-
-    try:
-        r = requests.get(GOOGLE_BOOKS_API, params=params, timeout=timeout_s)
-        if debug:
-            print("---- Google Books raw response ----")
-            print(r.text)
-            print("---- end response ----")
-        r.raise_for_status()
-    except requests.RequestException as e:
-        print(f"Google Books request failed: {e}")
+    data = _fetch_provider_json(
+        "google_books", "Google Books", isbn, GOOGLE_BOOKS_API, params, timeout_s, debug,
+        is_found=lambda d: isinstance(d, dict) and d.get("items"),
+        deadline=deadline,
+    )
+    if not isinstance(data, dict):
         return None
 
-    data = r.json()
     items = data.get("items") or []
     if not items:
         return None
+    return _normalize_google(isbn, items[0])
+
 
-    item = items[0]
+def _normalize_google(isbn: str, item: dict[str, Any]) -> dict[str, Any]:
     v = item.get("volumeInfo") or {}
 
     isbns = _extract_isbns_from_google(v)
@@ -238,7 +295,22 @@ def fetch_google_books(isbn: str, timeout_s: int = 10, debug: bool = False) -> d
     
     return resp
 
-def fetch_book_with_fallback(isbn: str, merge: bool = True, debug: bool = False) -> dict[str, Any] | None:
+def fetch_book_with_fallback(
+    isbn: str,
+    merge: bool = True,
+    debug: bool = False,
+    parallel: bool = True,
+    deadline_s: float = PROVIDER_DEADLINE,
+) -> dict[str, Any] | None:
+    """
+    Open Library is the authority, Google Books fills the gaps.
+    Both fetchers answer from the provider meta cache (META_DIR) before going
+    to the network. With merge + parallel, both providers are queried at once, so latency is
+    the slower of the two, capped at deadline_s per provider.
+    """
+    if merge and parallel:
+        return _fetch_book_parallel(isbn, debug=debug, deadline_s=deadline_s)
+
     ol = fetch_openlibrary_book(isbn, debug=debug)
     gb = None
 
@@ -257,6 +329,141 @@ def fetch_book_with_fallback(isbn: str, merge: bool = True, debug: bool = False)
     return None
 
 
+def _fetch_book_parallel(isbn: str, debug: bool, deadline_s: float) -> dict[str, Any] | None:
+    timeout_s = max(1, int(deadline_s))
+    started = time.monotonic()
+    # the workers stop at the deadline too (retries included), so abandoned lookups free the pool
+    deadline = started + deadline_s
+    f_ol = _fanout_pool.submit(fetch_openlibrary_book, isbn, timeout_s, debug, deadline)
+    f_gb = _fanout_pool.submit(fetch_google_books, isbn, timeout_s, debug, deadline)
+
+    def result(fut, provider: str) -> dict[str, Any] | None:
+        remaining = max(0.0, deadline_s - (time.monotonic() - started))
+        try:
+            return fut.result(timeout=remaining)
+        except FutureTimeout:
+            print(f"{provider} missed the {deadline_s:g}s deadline for ISBN {isbn}, ignoring it.")
+        except Exception as e:
+            print(f"{provider} lookup failed: {e}")
+        return None
+
+    ol = result(f_ol, "Open Library")
+    gb = result(f_gb, "Google Books")
+
+    if ol:
+        return merge_book_data(ol, gb) if gb else ol
+    if gb:
+        return gb
+
+    print(f"No provider found data for ISBN {isbn}.")
+    return None
+
+
+def fetch_openlibrary_books(
+    isbns: list[str],
+    timeout_s: int = 10,
+    debug: bool = False,
+    batch_size: int = OPENLIB_BATCH_SIZE,
+    deadline: float | None = None,
+) -> dict[str, dict[str, Any] | None]:
+    """
+    Batch fetch_openlibrary_book: {isbn: normalized dict or None if not found}.
+    Cached answers are used as-is; the rest are requested batch_size at a time
+    through a comma-separated bibkeys list and cached per ISBN.
+    ISBNs whose request failed (or didn't start before `deadline`) are
+    missing from the result.
+    """
+    cache = get_meta_cache()
+    out: dict[str, dict[str, Any] | None] = {}
+    misses = []
+    batch_size = max(1, batch_size)
+
+    for isbn in dict.fromkeys(isbns):
+        hit = cache.get("openlibrary", isbn)
+        if hit is None:
+            misses.append(isbn)
+            continue
+        b = hit[1].get(f"ISBN:{isbn}") if isinstance(hit[1], dict) else None
+        out[isbn] = _normalize_openlibrary(isbn, b) if b else None
+
+    for i in range(0, len(misses), batch_size):
+        chunk = misses[i:i + batch_size]
+        params = {"bibkeys": ",".join(f"ISBN:{x}" for x in chunk), "format": "json", "jscmd": "data"}
+        try:
+            r = get_client().get(OPENLIB_BOOKS_API, params=params, timeout=timeout_s, deadline=deadline)
+            if debug:
+                print(f"---- Open Library raw response ({len(chunk)} ISBNs) ----")
+                print(r.text)
+                print("---- end response ----")
+            r.raise_for_status()
+            data = r.json()
+        except (requests.RequestException, ValueError) as e:
+            print(f"Open Library batch request failed: {e}")
+            continue
+
+        for isbn in chunk:
+            key = f"ISBN:{isbn}"
+            b = data.get(key) if isinstance(data, dict) else None
+            # same shape as a single-ISBN response, so fetch_openlibrary_book can reuse it
+            cache.put("openlibrary", isbn, {key: b} if b else {}, found=bool(b))
+            out[isbn] = _normalize_openlibrary(isbn, b) if b else None
+
+    return out
+
+
+def fetch_books_with_fallback(
+    isbns: list[str],
+    merge: bool = True,
+    debug: bool = False,
+    timeout_s: int = 10,
+    deadline_s: float | None = None,
+) -> dict[str, dict[str, Any] | None]:
+    """
+    fetch_book_with_fallback for many ISBNs at once: {isbn: book or None}.
+    Open Library misses go out as multi-ISBN requests; Google Books has no
+    batch lookup, so its cache misses fan out on the batch pool (not the scan
+    lookup pool) while the Open Library batches run.
+    With deadline_s, whatever hasn't answered by then counts as not found.
+    """
+    isbns = list(dict.fromkeys(isbns))
+    deadline = time.monotonic() + deadline_s if deadline_s else None
+    cache = get_meta_cache()
+    gb: dict[str, dict[str, Any] | None] = {}
+    pending = {}
+
+    def want_google(targets: list[str]) -> None:
+        for isbn in targets:
+            if cache.get("google_books", isbn) is not None:
+                gb[isbn] = fetch_google_books(isbn, timeout_s, debug)
+            else:
+                pending[isbn] = _batch_pool.submit(fetch_google_books, isbn, timeout_s, debug, deadline)
+
+    if merge:
+        want_google(isbns)
+    ol = fetch_openlibrary_books(isbns, timeout_s, debug, deadline=deadline)
+    if not merge:
+        want_google([isbn for isbn in isbns if not ol.get(isbn)])
+
+    for isbn, fut in pending.items():
+        try:
+            gb[isbn] = fut.result(timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+        except FutureTimeout:
+            fut.cancel()
+            gb[isbn] = None
+        except Exception as e:
+            print(f"Google Books lookup failed: {e}")
+            gb[isbn] = None
+
+    out: dict[str, dict[str, Any] | None] = {}
+    for isbn in isbns:
+        o, g = ol.get(isbn), gb.get(isbn)
+        if o:
+            out[isbn] = merge_book_data(o, g) if (merge and g) else o
+        else:
+            out[isbn] = g
+    return out
+
+
 # ========== Scanner ==========
 
 def listen_scanner(prompt: str = "Scan barcode/ISBN: "):
@@ -0,0 +1,211 @@
+# services/covers.py
+from __future__ import annotations
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import requests
+
+from config import COVER_PREFETCH_BACKLOG, COVER_PREFETCH_WORKERS, TTL_COVER_MISSING, TTL_THUMBS
+from providers import get_client
+
+try:  # optional: without Pillow covers are cached but served unresized
+    from PIL import Image, features
+except ImportError:  # pragma: no cover
+    Image = None
+    features = None
+
+# name -> bounding box (px)
+THUMB_SIZES = {
+    "small": (96, 144),
+    "medium": (200, 300),
+    "large": (400, 600),
+}
+
+# Covers smaller than this are placeholders (Open Library serves a 1x1 gif for unknown ISBNs).
+MIN_COVER_BYTES = 1024
+# Retry delay after a download failed for a reason other than a missing cover.
+COVER_RETRY_SECONDS = 300
+
+
+def _thumb_format() -> tuple[str, str, str]:
+    """
+    (Pillow format, file suffix, mimetype): WebP when Pillow was built with it, else JPEG.
+    """
+    if features is not None and features.check("webp"):
+        return "WEBP", ".webp", "image/webp"
+    return "JPEG", ".jpg", "image/jpeg"
+
+
+class CoverCache:
+    """
+    Local copies of book covers plus fixed-size thumbnails:
+    <root>/<item_id>/source.json, original, <size>.webp|.jpg
+
+    A cover is downloaded once and re-fetched when its URL changes or, if
+    TTL_THUMBS is set, when it gets older than that. A URL that gave no usable
+    cover is recorded in source.json and not retried for `missing_ttl`.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        ttl: int = TTL_THUMBS,
+        workers: int = COVER_PREFETCH_WORKERS,
+        missing_ttl: int = TTL_COVER_MISSING,
+        backlog: int = COVER_PREFETCH_BACKLOG,
+    ) -> None:
+        self.root = Path(root)
+        self.ttl = ttl
+        self.missing_ttl = missing_ttl
+        self.backlog = backlog
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="cover")
+        self._inflight: set[str] = set()
+        self._lock = threading.Lock()
+
+    def _dir(self, item_id: str) -> Path:
+        # item ids come from URLs; never let them climb out of root
+        safe = item_id.replace("/", "_").replace("\\", "_").lstrip(".")
+        return self.root / safe
+
+    def _source(self, item_id: str) -> dict[str, Any]:
+        try:
+            return json.loads((self._dir(item_id) / "source.json").read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _fresh(self, item_id: str, url: str) -> bool:
+        src = self._source(item_id)
+        if src.get("url") != url or not (self._dir(item_id) / "original").exists():
+            return False
+        return not self.ttl or time.time() - float(src.get("fetched_at") or 0) <= self.ttl
+
+    def _known_missing(self, item_id: str, url: str) -> bool:
+        src = self._source(item_id)
+        return bool(src.get("missing")) and src.get("url") == url and time.time() < float(src.get("until") or 0)
+
+    def _mark_missing(self, item_id: str, url: str, ttl: float) -> None:
+        """
+        Negative marker: no usable cover at `url` until `ttl` seconds from now.
+        """
+        d = self._dir(item_id)
+        d.mkdir(parents=True, exist_ok=True)
+        for old in d.iterdir():
+            if old.name != "source.json":
+                old.unlink(missing_ok=True)
+        _atomic_write(d / "source.json", json.dumps({
+            "url": url,
+            "missing": True,
+            "until": time.time() + ttl,
+        }).encode("utf-8"))
+
+    def fetch(self, item_id: str, url: str) -> bool:
+        """
+        Download the cover unless a fresh copy exists or the URL is known to
+        have none. Old thumbnails are dropped. Returns True when a usable
+        original is on disk.
+        """
+        if self._fresh(item_id, url):
+            return True
+        has_original = (self._dir(item_id) / "original").exists()
+        if self._known_missing(item_id, url):
+            return False
+        try:
+            r = get_client().get(url, timeout=15)
+            r.raise_for_status()
+        except requests.RequestException as e:
+            print(f"Cover download failed for {item_id}: {e}")
+            if not has_original:
+                status = getattr(e.response, "status_code", None)
+                gone = status is not None and 400 <= status < 500 and status != 429
+                self._mark_missing(item_id, url, self.missing_ttl if gone else COVER_RETRY_SECONDS)
+            return has_original
+
+        if len(r.content) < MIN_COVER_BYTES:
+            if not has_original:
+                self._mark_missing(item_id, url, self.missing_ttl)
+            return has_original
+
+        d = self._dir(item_id)
+        d.mkdir(parents=True, exist_ok=True)
+        for old in d.iterdir():
+            if old.name not in ("original", "source.json"):
+                old.unlink(missing_ok=True)
+
+        _atomic_write(d / "original", r.content)
+        _atomic_write(d / "source.json", json.dumps({
+            "url": url,
+            "fetched_at": time.time(),
+            "content_type": r.headers.get("Content-Type"),
+        }).encode("utf-8"))
+        return True
+
+    def thumbnail(self, item_id: str, size: str, url: str | None = None) -> tuple[Path, str] | None:
+        """
+        (path, mimetype) of the thumbnail, rendering it on first request.
+        With `url`, the original is (re)fetched first if missing or stale.
+        """
+        if size not in THUMB_SIZES:
+            raise ValueError(f"Unknown cover size: {size!r}")
+        if url and not self.fetch(item_id, url):
+            return None
+
+        d = self._dir(item_id)
+        original = d / "original"
+        if not original.exists():
+            return None
+
+        if Image is None:
+            return original, self._source(item_id).get("content_type") or "image/jpeg"
+
+        fmt, suffix, mimetype = _thumb_format()
+        thumb = d / f"{size}{suffix}"
+        if not thumb.exists() or thumb.stat().st_mtime < original.stat().st_mtime:
+            try:
+                with Image.open(original) as im:
+                    im = im.convert("RGB")
+                    im.thumbnail(THUMB_SIZES[size], Image.LANCZOS)
+                    buf = io.BytesIO()
+                    im.save(buf, fmt, quality=82, method=4) if fmt == "WEBP" else im.save(buf, fmt, quality=85, optimize=True)
+            except (OSError, ValueError, Image.DecompressionBombError) as e:
+                # not an image (e.g. an HTML error page served with 200): treat as no cover
+                print(f"Cover for {item_id} is not a usable image: {e}")
+                self._mark_missing(item_id, self._source(item_id).get("url") or url or "", self.missing_ttl)
+                return None
+            _atomic_write(thumb, buf.getvalue())
+        return thumb, mimetype
+
+    def prefetch(self, book: dict[str, Any]) -> None:
+        """
+        Store listener: download the cover and render the default thumbnail in the background.
+        Skipped once `backlog` prefetches are queued (e.g. during a bulk import);
+        those covers are fetched on first view instead.
+        """
+        item_id, url = book.get("id"), (book.get("cover_image") or "").strip()
+        if not item_id or not url:
+            return
+        with self._lock:
+            if item_id in self._inflight or len(self._inflight) >= self.backlog:
+                return
+            self._inflight.add(item_id)
+        self._pool.submit(self._prefetch, item_id, url)
+
+    def _prefetch(self, item_id: str, url: str) -> None:
+        try:
+            self.thumbnail(item_id, "medium", url)
+        except Exception as e:
+            print(f"Cover prefetch failed for {item_id}: {e}")
+        finally:
+            with self._lock:
+                self._inflight.discard(item_id)
+
+
+def _atomic_write(p: Path, data: bytes) -> None:
+    tmp = p.with_name(f"{p.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, p)
@@ -0,0 +1,188 @@
+# services/importer.py
+from __future__ import annotations
+import csv
+from typing import Any, Callable, Iterator, TextIO
+
+from config import IMPORT_CHUNK_SIZE
+from scanner import fetch_books_with_fallback, normalize_code
+from stores.serializer import loads
+
+IMPORT_FORMATS = ("ndjson", "csv")
+
+# CSV header names recognised as the code column (first column otherwise)
+_CODE_COLUMNS = ("isbn", "isbn13", "isbn10", "code", "asin")
+
+
+def detect_format(filename: str | None, content_type: str | None) -> str | None:
+    name = (filename or "").lower()
+    ctype = (content_type or "").lower()
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in ctype or "jsonl" in ctype:
+        return "ndjson"
+    if name.endswith(".csv") or "csv" in ctype:
+        return "csv"
+    return None
+
+
+def count_records(f: TextIO, fmt: str = "ndjson") -> int:
+    """
+    Records run_import will see from the current position: non-blank lines,
+    or CSV rows minus any header row (see iter_csv_codes). The caller rewinds.
+    """
+    if fmt == "csv":
+        return sum(1 for _ in iter_csv_codes(f))
+    return sum(1 for line in f if line.strip())
+
+
+def prepare_book(book: Any) -> tuple[dict[str, Any] | None, str | None]:
+    """
+    Validate an imported book object and canonicalize its identifier with
+    normalize_code. Returns (book, None) or (None, error).
+    """
+    if not isinstance(book, dict):
+        return None, "Expected a JSON object."
+
+    idents = dict(book.get("identifiers") or {})
+    raw = idents.get("isbn") or idents.get("isbn13") or idents.get("isbn10") or idents.get("asin")
+    parsed = normalize_code(str(raw)) if raw else None
+    if not parsed:
+        return None, "Missing or invalid identifiers (expected ISBN-10/13 or ASIN)."
+
+    kind, value = parsed
+    idents[kind] = value
+    if kind == "asin":
+        idents.pop("isbn", None)
+    # ids and timestamps belong to the target store
+    out = {k: v for k, v in book.items() if k not in ("id", "added_at", "updated_at")}
+    out["identifiers"] = idents
+    return out, None
+
+
+def iter_ndjson(f: TextIO) -> Iterator[tuple[int, dict[str, Any] | None, str | None]]:
+    """
+    (line number, book, error) per non-blank line, parsed one line at a time.
+    """
+    for n, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            obj = loads(line)
+        except ValueError as e:
+            yield n, None, f"Invalid JSON: {e}"
+            continue
+        book, error = prepare_book(obj)
+        yield n, book, error
+
+
+def iter_csv_codes(f: TextIO) -> Iterator[tuple[int, tuple[str, str] | None, str]]:
+    """
+    (line number, normalized (kind, value) or None, raw code) per CSV row.
+    Uses an isbn/code column when the first row is a header, else the first column.
+    """
+    reader = csv.reader(f)
+    col = 0
+    for row in reader:
+        n = reader.line_num
+        if not row or not any(c.strip() for c in row):
+            continue
+        if n == 1:
+            header = [c.strip().lower() for c in row]
+            named = next((header.index(c) for c in _CODE_COLUMNS if c in header), None)
+            if named is not None:
+                col = named
+                continue
+        raw = row[col].strip() if col < len(row) else ""
+        yield n, normalize_code(raw), raw
+
+
+def _chunks(it: Iterator, size: int) -> Iterator[list]:
+    chunk = []
+    for x in it:
+        chunk.append(x)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def run_import(
+    f: TextIO,
+    fmt: str,
+    store,
+    *,
+    lookup: bool = True,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    on_result: Callable[[dict[str, Any]], None] | None = None,
+    cancelled: Callable[[], bool] | None = None,
+) -> dict[str, int]:
+    """
+    Import books from an NDJSON stream of book objects or a CSV of ISBNs,
+    chunk_size records at a time. Each chunk is written with store.upsert_many(),
+    i.e. one index commit (JSON store) or one transaction (SQLite); a chunk that
+    fails is retried book by book so only the bad records are reported.
+    CSV ISBNs are looked up with the batch provider fetcher unless lookup=False,
+    in which case identifier-only stubs are stored for a later refresh.
+
+    on_result gets {"status": "imported"|"failed", "line", "id"|"error"} per record.
+    """
+    counts = {"imported": 0, "failed": 0}
+
+    def report(res: dict[str, Any]) -> None:
+        counts[res["status"]] += 1
+        if on_result:
+            on_result(res)
+
+    if fmt == "ndjson":
+        records = iter_ndjson(f)
+    elif fmt == "csv":
+        records = iter_csv_codes(f)
+    else:
+        raise ValueError(f"Unsupported import format: {fmt!r}")
+
+    for chunk in _chunks(records, max(1, chunk_size)):
+        if cancelled and cancelled():
+            break
+
+        books: list[tuple[int, dict[str, Any]]] = []
+        if fmt == "ndjson":
+            for n, book, error in chunk:
+                if error:
+                    report({"status": "failed", "line": n, "error": error})
+                else:
+                    books.append((n, book))
+        else:
+            isbns = [p[1] for _, p, _ in chunk if p and p[0] == "isbn"]
+            fetched = fetch_books_with_fallback(isbns, merge=False) if (lookup and isbns) else {}
+            for n, p, raw in chunk:
+                if not p:
+                    report({"status": "failed", "line": n, "error": f"Unsupported code: {raw!r}"})
+                    continue
+                kind, value = p
+                if lookup and kind == "isbn":
+                    book = fetched.get(value)
+                    if not book:
+                        report({"status": "failed", "line": n, "error": f"No provider data for ISBN {value}."})
+                        continue
+                else:
+                    book = {"type": "book", "identifiers": {kind: value}}
+                books.append((n, book))
+
+        if not books:
+            continue
+        try:
+            saved = store.upsert_many([book for _, book in books])
+        except Exception:
+            # isolate the bad record(s): redo this chunk one book at a time
+            with store.batch():
+                for n, book in books:
+                    try:
+                        one = store.upsert_book(book)
+                    except Exception as e:
+                        report({"status": "failed", "line": n, "error": str(e)})
+                        continue
+                    report({"status": "imported", "line": n, "id": one.get("id")})
+            continue
+        for (n, _), one in zip(books, saved):
+            report({"status": "imported", "line": n, "id": one.get("id")})
+
+    return counts
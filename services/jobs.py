@@ -0,0 +1,163 @@
+# services/jobs.py
+from __future__ import annotations
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from config import JOB_KEEP, JOB_WORKERS
+from stores.book_store import utc_now_iso
+
+
+@dataclass
+class Job:
+    """
+    One background task. The worker reports progress through record();
+    readers poll to_dict(). All mutation happens under `lock`.
+    """
+    id: str
+    kind: str
+    status: str = "queued"  # queued | running | done | failed | cancelled
+    total: int | None = None
+    counts: dict[str, int] = field(default_factory=lambda: {"updated": 0, "skipped": 0, "failed": 0})
+    results: list[dict[str, Any]] = field(default_factory=list)
+    error: str | None = None
+    created_at: str = field(default_factory=utc_now_iso)
+    started_at: str | None = None
+    finished_at: str | None = None
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    _cancel: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed", "cancelled")
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def record(self, result: dict[str, Any], bucket: str | None = None, keep: bool = True) -> None:
+        """
+        Count one finished item; keep=False counts it without storing the result.
+        """
+        bucket = bucket or result.get("status")
+        if bucket == "dry_run":
+            bucket = "updated"
+        with self.lock:
+            if bucket in self.counts:
+                self.counts[bucket] += 1
+            if keep:
+                self.results.append(result)
+
+    def to_dict(self, since: int = 0) -> dict[str, Any]:
+        """
+        Snapshot for polling. Only results[since:] are included so clients can
+        fetch per-item results incrementally; `next` is the since= to send next.
+        """
+        with self.lock:
+            return {
+                "id": self.id,
+                "kind": self.kind,
+                "status": self.status,
+                "total": self.total,
+                "done": sum(self.counts.values()),
+                "counts": dict(self.counts),
+                "results": self.results[since:],
+                "next": len(self.results),
+                "error": self.error,
+                "cancel_requested": self.cancel_requested,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+            }
+
+
+class JobQueue:
+    """
+    In-process job queue. Jobs live in this process only: under a multi-worker
+    server, poll the worker that accepted the job (or run a single worker).
+    The newest `keep` jobs are kept for polling; older finished ones are dropped.
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, keep: int = JOB_KEEP) -> None:
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="job")
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._lock = threading.Lock()
+        self.keep = keep
+
+    def submit(
+        self,
+        kind: str,
+        fn: Callable[[Job], None],
+        buckets: tuple[str, ...] = ("updated", "skipped", "failed"),
+        cleanup: Callable[[], None] | None = None,
+    ) -> Job:
+        """
+        Queue fn(job). cleanup() runs once the job is over, however it ended
+        (including a cancel before it started), e.g. to delete a spooled upload.
+        """
+        job = Job(id=uuid.uuid4().hex, kind=kind, counts={b: 0 for b in buckets})
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        self._pool.submit(self._run, job, fn, cleanup)
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> list[Job]:
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def _prune(self) -> None:
+        extra = len(self._jobs) - self.keep
+        for job_id in [j.id for j in self._jobs.values() if j.finished][:max(0, extra)]:
+            del self._jobs[job_id]
+
+    def _run(self, job: Job, fn: Callable[[Job], None], cleanup: Callable[[], None] | None = None) -> None:
+        try:
+            with job.lock:
+                if job.cancel_requested:
+                    job.status = "cancelled"
+                    job.finished_at = utc_now_iso()
+                    return
+                job.status = "running"
+                job.started_at = utc_now_iso()
+            try:
+                fn(job)
+                status, error = ("cancelled" if job.cancel_requested else "done"), None
+            except Exception as e:
+                status, error = "failed", str(e)
+            with job.lock:
+                job.status = status
+                job.error = error
+                job.finished_at = utc_now_iso()
+        finally:
+            if cleanup is not None:
+                try:
+                    cleanup()
+                except Exception as e:
+                    print(f"Job {job.id} cleanup failed: {e}")
+
+
+_queue: JobQueue | None = None
+_queue_lock = threading.Lock()
+
+
+def get_queue() -> JobQueue:
+    """
+    Process-wide JobQueue, created on first use.
+    """
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = JobQueue()
+    return _queue
@@ -0,0 +1,217 @@
+# services/refresh.py
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable
+
+from config import OPENLIB_BATCH_SIZE, REFRESH_CONCURRENCY
+from scanner import fetch_book_with_fallback, fetch_books_with_fallback
+
+
+def needs_refresh(book: dict) -> bool:
+    # tweak rules as you like
+    missing = (
+        not (book.get("title") or "").strip()
+        or not (book.get("authors") or [])
+        or not (book.get("publish_date") or "").strip()
+        or not (book.get("cover_image") or "").strip()
+        or not (book.get("language") or "").strip()
+    )
+    return bool(missing)
+
+
+def best_isbn(book: dict[str, Any]) -> str | None:
+    """
+    Prefer isbn13, then isbn10, then isbn.
+    """
+    ids = book.get("identifiers") or {}
+    for k in ("isbn13", "isbn10", "isbn"):
+        v = ids.get(k)
+        if isinstance(v, str) and v.strip():
+            return v.strip()
+    return None
+
+
+def providers_of(book: dict[str, Any]) -> list[str]:
+    srcs = book.get("sources") or []
+    out: list[str] = []
+    seen = set()
+    for s in srcs:
+        if not isinstance(s, dict):
+            continue
+        p = s.get("provider")
+        if not p:
+            continue
+        if p in seen:
+            continue
+        seen.add(p)
+        out.append(p)
+    return out
+
+
+def summarize_result(res: dict[str, Any], cur: dict[str, Any] | None = None) -> dict[str, Any]:
+    """
+    Checklist-friendly view of a refresh_one_book() result, without the full book documents.
+    """
+    book = res.get("saved") or res.get("book") or cur or {}
+    out = {k: v for k, v in res.items() if k not in ("saved", "book")}
+    out.update({
+        "isbn": best_isbn(book),
+        "title": book.get("title"),
+        "subtitle": book.get("subtitle"),
+        "sources": providers_of(book),
+    })
+    return out
+
+
+def refresh_one_book(
+    cur: dict[str, Any],
+    write: Callable[[dict[str, Any]], tuple[dict[str, Any], bool]],
+    *,
+    debug: bool,
+    dry_run: bool,
+    lookup: Callable[[str], dict[str, Any] | None] | None = None,
+) -> dict[str, Any]:
+    """
+    Refresh a single book based on best ISBN. Optionally dry-run.
+    Saves via write(book) -> (saved, changed) unless dry_run (see store_writer());
+    status is "updated", or "unchanged" when the provider data changed nothing.
+    lookup(isbn) supplies provider data; defaults to fetch_book_with_fallback.
+    """
+    item_id = cur.get("id")
+    isbn = best_isbn(cur)
+    if not isbn:
+        return {"status": "failed", "id": item_id, "error": "No ISBN available to refresh."}
+
+    if lookup is None:
+        fresh = fetch_book_with_fallback(isbn, merge=True, debug=debug)
+    else:
+        fresh = lookup(isbn)
+    if not fresh:
+        return {"status": "failed", "id": item_id, "error": f"No provider data for ISBN {isbn}."}
+
+    if dry_run:
+        return {"status": "dry_run", "id": item_id, "book": fresh}
+
+    saved, changed = write(fresh)
+    return {"status": "updated" if changed else "unchanged", "id": saved.get("id") or item_id, "saved": saved}
+
+
+def store_writer(store) -> Callable[[dict[str, Any]], tuple[dict[str, Any], bool]]:
+    """
+    write() for refresh_one_book: upsert one book, reporting whether it changed.
+    """
+    return lambda book: store.upsert_changes([book])[0]
+
+
+def run_refresh(
+    items: list[dict],
+    store,
+    *,
+    debug: bool,
+    dry_run: bool,
+    only_missing: bool,
+    concurrency: int = REFRESH_CONCURRENCY,
+    batch_size: int = OPENLIB_BATCH_SIZE,
+    on_result: Callable[[dict[str, Any], dict[str, Any]], None] | None = None,
+    cancelled: Callable[[], bool] | None = None,
+) -> dict:
+    """
+    Refresh many books, batch_size at a time with up to `concurrency` batches
+    in flight. Each batch is looked up with fetch_books_with_fallback, so Open
+    Library sees one multi-ISBN request per batch instead of one per book.
+    Provider rate limits are enforced by the shared ProviderClient; each batch
+    is saved with one store.upsert_changes() call on a single writer thread, so
+    writes never interleave. Books the providers had nothing new for are not
+    rewritten and are reported as "unchanged".
+    Results come back in input order.
+
+    on_result(res, current) is called as each batch finishes.
+    Once cancelled() returns True, batches not yet started are dropped from the summary.
+    """
+    updated = []
+    unchanged = []
+    skipped = []
+    failed = []
+    batch_size = max(1, batch_size)
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="store-writer") as writer, \
+         ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="refresh") as pool:
+
+        def work(batch: list[dict]) -> list[dict]:
+            if cancelled and cancelled():
+                return [{"status": "cancelled", "id": cur.get("id")} for cur in batch]
+
+            todo = [cur for cur in batch if not (only_missing and not needs_refresh(cur))]
+            isbns = [isbn for isbn in (best_isbn(cur) for cur in todo) if isbn]
+            try:
+                fresh = fetch_books_with_fallback(isbns, merge=True, debug=debug) if isbns else {}
+            except Exception as e:
+                fresh, error = {}, str(e)
+            else:
+                error = None
+
+            out = []
+            staged: list[tuple[int, dict[str, Any]]] = []
+
+            def stage(book: dict[str, Any]) -> tuple[dict[str, Any], bool]:
+                staged.append((len(out), book))
+                return book, True
+
+            for cur in batch:
+                if only_missing and not needs_refresh(cur):
+                    out.append({"status": "skipped", "id": cur.get("id"), "reason": "not_missing"})
+                    continue
+                if error:
+                    out.append({"status": "failed", "id": cur.get("id"), "error": error})
+                    continue
+                try:
+                    out.append(refresh_one_book(cur, stage, debug=debug, dry_run=dry_run, lookup=fresh.get))
+                except Exception as e:
+                    out.append({"status": "failed", "id": cur.get("id"), "error": str(e)})
+
+            if staged:
+                try:
+                    saved = writer.submit(store.upsert_changes, [book for _, book in staged]).result()
+                except Exception as e:
+                    for i, _ in staged:
+                        out[i] = {"status": "failed", "id": out[i]["id"], "error": str(e)}
+                else:
+                    for (i, _), (book, changed) in zip(staged, saved):
+                        out[i]["status"] = "updated" if changed else "unchanged"
+                        out[i]["saved"] = book
+                        out[i]["id"] = book.get("id") or out[i]["id"]
+            return out
+
+        batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+        futures = [pool.submit(work, batch) for batch in batches]
+        if on_result:
+            origin = {f: batch for f, batch in zip(futures, batches)}
+            for f in as_completed(futures):
+                for res, cur in zip(f.result(), origin[f]):
+                    if res["status"] != "cancelled":
+                        on_result(res, cur)
+
+        for res in (res for f in futures for res in f.result()):
+            if res["status"] == "cancelled":
+                continue
+            if res["status"] in ("updated", "dry_run"):
+                updated.append(res)
+            elif res["status"] == "unchanged":
+                unchanged.append(res)
+            elif res["status"] == "skipped":
+                skipped.append(res)
+            else:
+                failed.append(res)
+
+    return {
+        "updated": updated,
+        "unchanged": unchanged,
+        "skipped": skipped,
+        "failed": failed,
+        "counts": {
+            "updated": len(updated),
+            "unchanged": len(unchanged),
+            "skipped": len(skipped),
+            "failed": len(failed),
+        },
+    }
@@ -5,7 +5,15 @@ export async function apiPost(path, payload) {
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify(payload ?? {}),
     });
+    return readJson(res);
+}
+
+export async function apiGet(path) {
+    const res = await fetch(path, { headers: { "Accept": "application/json" } });
+    return readJson(res);
+}
 
+async function readJson(res) {
     const text = await res.text();
     let data;
     try { data = text ? JSON.parse(text) : null; }
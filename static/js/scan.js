@@ -1,9 +1,10 @@
 // static/js/scan.js
-import { apiPost } from "./api.js";
+import { apiGet, apiPost } from "./api.js";
 import { getCookie, setCookie } from "./cookies.js";
 
 const COOKIE_SCANNER_MODE = "scanner_mode";
 const COOKIE_SCANNER_DELAY = "scanner_delay";
+const JOB_POLL_MS = 1000;
 
 const els = {
     code: document.getElementById("code"),
@@ -24,6 +25,7 @@ const els = {
     scannerDelayInput: document.getElementById("scannerDelayInput"),
 
     btnRefreshAll: document.getElementById("btnRefreshAll"),
+    btnRefreshCancel: document.getElementById("btnRefreshCancel"),
     chkDryRun: document.getElementById("refreshDryRun"),
     refreshReport: document.getElementById("refreshReport"),
     refreshList: document.getElementById("refreshList"),
@@ -34,6 +36,7 @@ const els = {
 
 let lastLookup = null; // { kind, value, book, error }
 let lookupTimer = null;
+let refreshJobId = null;
 
 
 // --- Helpers ---
@@ -44,10 +47,10 @@ function clearRefreshReport() {
     els.refreshList.innerHTML = "";
 }
 
-function renderRefreshReport(result) {
+function renderRefreshReport(results) {
     if (!els.refreshReport || !els.refreshList) return;
 
-    const items = result?.updated_items || [];
+    const items = (results || []).filter(it => it.status === "updated" || it.status === "dry_run");
     if (!items.length) {
         els.refreshReport.style.display = "none";
         return;
@@ -206,27 +209,65 @@ function scheduleLookup() {
 async function refreshAllBooks() {
     if (!confirm("Refresh all books from OpenLibrary / Google Books?")) return;
 
+    clearRefreshReport();
     showStatus("Refreshing all books...");
 
     try {
-        const result = await apiPost("/api/books/refresh", {
+        const { job_id } = await apiPost("/api/books/refresh", {
             dry_run: els.chkDryRun?.checked ?? false,
             only_missing: false,
         });
-
-        els.raw.textContent = JSON.stringify(result, null, 2);
-        renderRefreshReport(result);
-
-        showStatus(
-            `Done: ${result.counts.updated} updated · ` +
-            `${result.counts.skipped} skipped · ` +
-            `${result.counts.failed} failed`
-        );
+        refreshJobId = job_id;
+        setRefreshRunning(true);
+
+        const results = [];
+        let since = 0;
+        for (;;) {
+            const job = await apiGet(`/api/jobs/${job_id}?since=${since}`);
+            results.push(...job.results);
+            since = job.next;
+
+            const progress = job.total ? `${job.done}/${job.total}` : `${job.done}`;
+            const counts =
+                `${job.counts.updated} updated · ` +
+                `${job.counts.unchanged} unchanged · ` +
+                `${job.counts.skipped} skipped · ` +
+                `${job.counts.failed} failed`;
+
+            if (job.status === "done" || job.status === "cancelled" || job.status === "failed") {
+                els.raw.textContent = JSON.stringify({ ...job, results }, null, 2);
+                renderRefreshReport(results);
+                const label = { done: "Done", cancelled: "Cancelled", failed: "Failed" }[job.status];
+                showStatus(`${label}: ${counts}` + (job.error ? ` (${job.error})` : ""), job.status === "failed");
+                break;
+            }
+
+            showStatus(`Refreshing ${progress}: ${counts}`);
+            await new Promise(r => setTimeout(r, JOB_POLL_MS));
+        }
     } catch (e) {
         showStatus(e.message || "Refresh failed", true);
+    } finally {
+        refreshJobId = null;
+        setRefreshRunning(false);
     }
 }
 
+async function cancelRefresh() {
+    if (!refreshJobId) return;
+    try {
+        await apiPost(`/api/jobs/${refreshJobId}/cancel`, {});
+        showStatus("Cancelling refresh...");
+    } catch (e) {
+        showStatus(e.message || "Cancel failed", true);
+    }
+}
+
+function setRefreshRunning(running) {
+    if (els.btnRefreshAll) els.btnRefreshAll.disabled = running;
+    if (els.btnRefreshCancel) els.btnRefreshCancel.style.display = running ? "" : "none";
+}
+
 
 // ----- Events -----
 
@@ -275,6 +316,7 @@ els.scannerDelayInput?.addEventListener("change", () => {
 });
 
 els.btnRefreshAll?.addEventListener("click", refreshAllBooks);
+els.btnRefreshCancel?.addEventListener("click", cancelRefresh);
 
 
 
@@ -0,0 +1,21 @@
+from config import STORE_BACKEND
+from .book_store import BookStore
+from .sqlite_book_store import SqliteBookStore
+
+__all__ = ["BookStore", "SqliteBookStore", "open_store"]
+
+_BACKENDS = {
+    "json": BookStore,
+    "sqlite": SqliteBookStore,
+}
+
+
+def open_store(backend: str | None = None):
+    """
+    Default store for the configured backend (LIBRARY_STORE_BACKEND).
+    """
+    name = (backend or STORE_BACKEND).strip().lower()
+    try:
+        return _BACKENDS[name].default()
+    except KeyError:
+        raise ValueError(f"Unknown store backend: {name!r} (expected one of {sorted(_BACKENDS)})") from None
@@ -1,11 +1,40 @@
 # stores/book_store.py
 from __future__ import annotations
+import atexit
+import hashlib
 import os
-import json
-from dataclasses import dataclass
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterable, Iterator
+
+from config import COMMIT_DURABILITY, COMMIT_WINDOW_MS, ITEMS_LAYOUT
+from stores.catalog import Catalog, listing_key
+from stores.catalog_store import CatalogStoreMixin
+from stores.serializer import dumps_bytes, loads
+
+try:  # optional: without flock (Windows) writes are only serialized within one process
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+# Fold the identifier log into index.json once it grows past this size.
+COMPACT_LOG_BYTES = 1 * 1024 * 1024
+# upsert_many batches at least this big commit with a snapshot rewrite instead of log appends.
+SNAPSHOT_COMMIT_MIN = 256
+# Item files moved per write-lock hold by BookStore.migrate_layout().
+MIGRATE_CHUNK = 500
+# Record fields that change on every write and don't count as content.
+VOLATILE_FIELDS = ("added_at", "updated_at")
+# Export snapshot directories left behind (crashed process) are removed after this long.
+SNAPSHOT_STALE_SECONDS = 24 * 3600
+# When upsert_changes() returns relative to its index commit; see BookStore.durability.
+DURABILITY_MODES = ("async", "commit", "fsync")
 
 
 def project_root_from_here() -> Path:
@@ -24,13 +53,157 @@ def safe_slug(s: str) -> str:
     return keep.strip("-") or "item"
 
 
-@dataclass(frozen=True)
-class BookStore:
+def book_identifier(book: dict[str, Any]) -> tuple[str, str]:
+    """
+    (kind, value) a book is indexed under: isbn first, then asin.
+    """
+    idents = book.get("identifiers") or {}
+    if "isbn" in idents:
+        return "isbn", idents["isbn"]
+    if "asin" in idents:
+        return "asin", idents["asin"]
+    raise ValueError("book.identifiers must include isbn or asin")
+
+
+def make_item_id(kind: str, value: str, book: dict[str, Any]) -> str:
+    title = book.get("title") or f"book-{value}"
+    return f"book_{kind}_{value}_{safe_slug(title)[:32]}"
+
+
+def merge_stored_book(
+    book: dict[str, Any],
+    kind: str,
+    value: str,
+    existing_id: str | None,
+    existing: dict[str, Any] | None,
+    now: str,
+) -> dict[str, Any]:
+    """
+    New stored record for `book`: merged over the existing record when the
+    identifier is already known, otherwise a fresh item with a new id.
+    """
+    if existing_id:
+        existing = existing or {}
+        merged = {**existing, **book}
+        merged["updated_at"] = now
+        merged.setdefault("added_at", existing.get("added_at") or now)
+        # the stored id is the item's key; an "id" in the incoming book never moves it
+        merged["id"] = existing_id
+        return merged
+
+    item_id = make_item_id(kind, value, book)
+    return {**book, "id": item_id, "added_at": now, "updated_at": now}
+
+
+def content_hash(book: dict[str, Any]) -> str:
+    """
+    Hash of a stored record's canonical content (sorted keys), ignoring the
+    timestamps a write would bump anyway.
+    """
+    canonical = {k: v for k, v in book.items() if k not in VOLATILE_FIELDS}
+    return hashlib.blake2b(dumps_bytes(canonical, pretty=False, sort_keys=True), digest_size=16).hexdigest()
+
+
+def _stat_sig(p: Path) -> tuple[int, int, int] | None:
+    try:
+        st = p.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def shard_prefix(item_id: str) -> str:
+    """
+    Two-level directory for an item in the sharded layout, e.g. "3f/a2".
+    """
+    h = hashlib.blake2b(item_id.encode("utf-8"), digest_size=2).hexdigest()
+    return f"{h[:2]}/{h[2:]}"
+
+
+def _atomic_write(p: Path, data: bytes, fsync: bool = False) -> None:
+    # tmp name is unique per writer so concurrent replaces never share a file
+    tmp = p.with_name(f"{p.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with tmp.open("wb") as f:
+        f.write(data)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp, p)
+
+
+def _new_group() -> dict[str, Any]:
+    # index entries waiting for one shared log append; see BookStore._enqueue_commit()
+    return {"entries": [], "done": threading.Event(), "error": None, "timer": None}
+
+
+def _link_or_copy(candidates: Iterable[Path], dest: Path) -> None:
+    """
+    Hard-link the first existing candidate to dest (a copy where the
+    filesystem has no hard links).
+    """
+    for p in candidates:
+        try:
+            os.link(p, dest)
+        except FileNotFoundError:
+            continue
+        except OSError:
+            try:
+                shutil.copyfile(p, dest)
+            except FileNotFoundError:
+                continue
+        return
+
+
+def _parse_log_lines(data: bytes) -> list[dict[str, Any]]:
+    out = []
+    for line in data.splitlines():
+        try:
+            entry = loads(line)
+        except ValueError:
+            # torn line from an interrupted append
+            continue
+        if isinstance(entry, dict) and entry.get("key") and entry.get("id"):
+            out.append(entry)
+    return out
+
+
+@dataclass(eq=False)
+class BookStore(CatalogStoreMixin):
     data_root: Path  # e.g. Path(".../data")
+    # items/ab/cd/<id>.json instead of items/<id>.json; see item_path()
+    sharded: bool = False
+    # "async" upserts within this many ms share one index commit (0: commit each); see _enqueue_commit()
+    commit_window_ms: float = COMMIT_WINDOW_MS
+    # "async" | "commit" | "fsync": how far an upsert's commit gets before it returns
+    durability: str = COMMIT_DURABILITY
+    # parsed index kept between calls, with the snapshot and log position it reflects; see _load_index()
+    _idx: dict[str, Any] | None = field(default=None, init=False, repr=False)
+    _snap_sig: tuple[int, int, int] | None = field(default=None, init=False, repr=False)
+    # snapshot the in-memory index was last rebuilt from (None never matches a catalog)
+    _idx_sig: tuple[int, int, int] | None = field(default=None, init=False, repr=False)
+    _log_ino: int | None = field(default=None, init=False, repr=False)
+    _log_offset: int = field(default=0, init=False, repr=False)
+    _catalog: Catalog = field(default_factory=Catalog, init=False, repr=False)
+    _listeners: list = field(default_factory=list, init=False, repr=False)
+    # per-thread buffer of index log entries while inside batch()
+    _batch: threading.local = field(default_factory=threading.local, init=False, repr=False)
+    # write lock: _mutex between threads, flock on lock_path between processes; see _write_lock()
+    _mutex: threading.RLock = field(default_factory=threading.RLock, init=False, repr=False)
+    _lock_fd: int = field(default=-1, init=False, repr=False)
+    _lock_depth: int = field(default=0, init=False, repr=False)
+    # guards the in-memory index and replay position; never held while taking the write lock
+    _index_lock: threading.RLock = field(default_factory=threading.RLock, init=False, repr=False)
+    # pending write-behind group, swapped out by _take_group()
+    _group: dict[str, Any] = field(default_factory=_new_group, init=False, repr=False)
+    _flush_at_exit: bool = field(default=False, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown commit durability: {self.durability!r} (expected one of {DURABILITY_MODES})")
 
     @classmethod
     def default(cls) -> "BookStore":
-        return cls(project_root_from_here() / "data")
+        return cls(project_root_from_here() / "data", sharded=ITEMS_LAYOUT == "sharded")
 
     @property
     def items_dir(self) -> Path:
@@ -40,64 +213,570 @@ class BookStore:
     def index_path(self) -> Path:
         return self.data_root / "index.json"
 
+    @property
+    def log_path(self) -> Path:
+        # append-only tail of index.json, one {"key", "id"} entry per upsert
+        return self.data_root / "index.log"
+
+    def item_path(self, item_id: str, sharded: bool | None = None) -> Path:
+        """
+        Where an item lives in this store's layout (or the given one).
+        """
+        if self.sharded if sharded is None else sharded:
+            return self.items_dir / shard_prefix(item_id) / f"{item_id}.json"
+        return self.items_dir / f"{item_id}.json"
+
+    def _item_paths(self, item_id: str) -> tuple[Path, Path, Path]:
+        """
+        Probe order for reads: own layout, the other one (not yet migrated, or
+        written by a process configured differently), then own layout again in
+        case migrate_layout() moved the file between the first two probes.
+        """
+        own = self.item_path(item_id)
+        return own, self.item_path(item_id, not self.sharded), own
+
+    @property
+    def lock_path(self) -> Path:
+        return self.data_root / "index.lock"
+
     def ensure(self) -> None:
         self.items_dir.mkdir(parents=True, exist_ok=True)
-        if not self.index_path.exists():
-            self.index_path.write_text(json.dumps({"by_identifier": {}}, indent=2), encoding="utf-8")
+        if self.index_path.exists():
+            return
+        with self._write_lock():
+            if not self.index_path.exists():
+                _atomic_write(self.index_path, dumps_bytes({"by_identifier": {}}))
+
+    @contextmanager
+    def _write_lock(self) -> Iterator[None]:
+        """
+        Re-entrant write lock across threads (_mutex) and processes (flock).
+        The flock outlives the last release while a write-behind group is pending.
+        """
+        with self._mutex:
+            if self._lock_fd < 0 and fcntl is not None:
+                self.data_root.mkdir(parents=True, exist_ok=True)
+                fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                except BaseException:
+                    os.close(fd)
+                    raise
+                self._lock_fd = fd
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0 and self._lock_fd >= 0 and not self._group["entries"]:
+                    fd, self._lock_fd = self._lock_fd, -1
+                    os.close(fd)  # releases the flock
 
     def _load_index(self) -> dict[str, Any]:
+        """
+        Snapshot (index.json) + replay of the identifier log.
+
+        The parsed index is memoized: index.json is only re-read when its
+        stat signature changes (another writer compacted), and the log is
+        read from the last seen offset, so a lookup in a quiet store costs
+        two stat() calls and no reads.
+
+        A new snapshot that directly follows the one the catalog is synced to
+        only marks the ids it lists as changed dirty, instead of forcing a
+        full catalog rebuild; see compact().
+        """
         self.ensure()
-        return json.loads(self.index_path.read_text(encoding="utf-8"))
+        with self._index_lock:
+            snap_sig = _stat_sig(self.index_path)
+
+            if self._idx is None or self._snap_sig != snap_sig:
+                idx = loads(self.index_path.read_bytes())
+                idx.setdefault("by_identifier", {})
+                base, changed = idx.pop("base", None), idx.pop("changed", None)
+                old = self._idx
+                catalog = self._catalog
+                if (
+                    changed is not None
+                    and old is not None
+                    and base == old.get("epoch", 0)
+                    and catalog.synced_version is not None
+                    and catalog.synced_version == self._idx_sig
+                ):
+                    catalog.dirty.update(changed)
+                    catalog.synced_version = snap_sig
+                self._idx, self._snap_sig, self._idx_sig = idx, snap_sig, snap_sig
+                self._log_ino, self._log_offset = None, 0
+
+            self._replay_log_tail()
+            return self._idx
+
+    def _replay_log_tail(self) -> None:
+        try:
+            st = self.log_path.stat()
+        except FileNotFoundError:
+            return
+
+        if self._log_ino != st.st_ino or st.st_size < self._log_offset:
+            # log was truncated or replaced: the snapshot has moved on too
+            if self._log_offset:
+                self._snap_sig = None
+                self._load_index()
+                return
+            self._log_ino = st.st_ino
+
+        if st.st_size == self._log_offset:
+            return
+
+        with self.log_path.open("rb") as f:
+            f.seek(self._log_offset)
+            chunk = f.read(st.st_size - self._log_offset)
+
+        # only consume complete lines; a torn tail is picked up on a later call
+        end = chunk.rfind(b"\n") + 1
+        by_ident = self._idx["by_identifier"]
+        catalog = self._catalog
+        for entry in _parse_log_lines(chunk[:end]):
+            by_ident[entry["key"]] = entry["id"]
+            if catalog.synced_version is not None:
+                catalog.dirty.add(entry["id"])
+        self._log_offset += end
 
     def _save_index(self, idx: dict[str, Any]) -> None:
-        tmp = self.index_path.with_suffix(".json.tmp")
-        tmp.write_text(json.dumps(idx, indent=2, ensure_ascii=False), encoding="utf-8")
-        os.replace(tmp, self.index_path)
+        _atomic_write(self.index_path, dumps_bytes(idx), fsync=self.durability == "fsync")
+
+    def _append_index_entries(self, entries: list[tuple[str, str]]) -> None:
+        """
+        Index commit in one log append, compacting when the log gets large.
+        Every written upsert is journaled (not just new identifiers) so other
+        processes can tell which items changed. A pending write-behind group
+        is committed in the same append. Callers hold the write lock.
+        """
+        group = self._take_group()
+        if group is not None:
+            entries = group["entries"] + list(entries)
+        if not entries:
+            return
+
+        try:
+            # log lines are always compact: one JSON document per line
+            data = b"".join(dumps_bytes({"key": k, "id": i}, pretty=False) + b"\n" for k, i in entries)
+            with self.log_path.open("ab") as f:
+                f.write(data)
+                f.flush()
+                if self.durability == "fsync":
+                    os.fsync(f.fileno())
+                end = f.tell()
+                ino = os.fstat(f.fileno()).st_ino
+        except BaseException as e:
+            if group is not None:
+                group["error"] = e
+            raise
+        finally:
+            if group is not None:
+                group["done"].set()
+
+        with self._index_lock:
+            if end - len(data) == self._log_offset and self._log_ino in (None, ino):
+                # nobody else appended since our last replay: skip re-reading our own line
+                self._log_offset = end
+                self._log_ino = ino
+
+        if end >= COMPACT_LOG_BYTES:
+            self.compact()
+
+    def _take_group(self) -> dict[str, Any] | None:
+        """
+        Detach the pending write-behind group, if any; the caller commits it
+        and sets its done event. Callers hold the write lock.
+        """
+        group = self._group
+        if not group["entries"]:
+            return None
+        self._group = _new_group()
+        if group["timer"] is not None:
+            group["timer"].cancel()
+        return group
+
+    def _enqueue_commit(self, entries: list[tuple[str, str]]) -> dict[str, Any]:
+        """
+        Add index entries to the pending group instead of appending them now,
+        so a scan burst's upserts share one log append. With "async" durability
+        flush() runs commit_window_ms after the group's first entry; otherwise
+        the first waiting writer to get the write lock commits everyone queued
+        behind it (see upsert_changes()). The next log append or compaction
+        commits the group too. Callers hold the write lock.
+        """
+        group = self._group
+        group["entries"].extend(entries)
+        if group["timer"] is None and self.durability == "async":
+            timer = threading.Timer(self.commit_window_ms / 1000, self._flush_from_timer)
+            timer.daemon = True
+            group["timer"] = timer
+            timer.start()
+            if not self._flush_at_exit:
+                self._flush_at_exit = True
+                atexit.register(self.flush)
+        return group
+
+    def _flush_from_timer(self) -> None:
+        try:
+            self.flush()
+        except Exception as e:
+            # writers waiting on the group get the error; nobody else would see it
+            print(f"Index group commit failed: {e}")
+
+    def flush(self) -> None:
+        """
+        Commit the pending write-behind group now. Runs from the group's timer
+        and at interpreter exit; multiprocessing workers skip atexit, so call it
+        before they return. A no-op when nothing is pending.
+        """
+        if not self._group["entries"]:
+            return
+        with self._write_lock():
+            self._append_index_entries([])
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Group this thread's upserts: item files are written as usual, but their
+        index log entries go out in a single append when the block exits.
+        The write lock is held for the whole block. Nested batches join the outer one.
+        """
+        if getattr(self._batch, "entries", None) is not None:
+            yield
+            return
+        with self._write_lock():
+            self._batch.entries = []
+            try:
+                yield
+            finally:
+                entries, self._batch.entries = self._batch.entries, None
+                if entries:
+                    self._append_index_entries(entries)
+
+    def compact(self, changed_ids: Iterable[str] = ()) -> None:
+        """
+        Fold the log (and any pending group) into a fresh index.json, then truncate the log.
+        The snapshot lists the ids changed since its predecessor, so other processes re-read only those.
+        """
+        with self._write_lock(), self._index_lock:
+            idx = self._load_index()
+            try:
+                folded = _parse_log_lines(self.log_path.read_bytes())
+            except FileNotFoundError:
+                folded = []
+            group = self._take_group()
+            changed = {e["id"] for e in folded} | {i for _k, i in (group or {}).get("entries", ())}
+            changed.update(changed_ids)
+
+            base = idx.get("epoch", 0)
+            idx["epoch"] = base + 1
+            self._save_index({**idx, "base": base, "changed": sorted(changed)})
+            self.log_path.write_bytes(b"")
+            # a pending write-behind group is in the in-memory index, so the snapshot committed it
+            if group is not None:
+                group["done"].set()
+
+            # the in-memory index already matches the new snapshot; adopt it without re-reading
+            was_synced = self._catalog.synced_version == self._snap_sig
+            self._snap_sig = self._idx_sig = _stat_sig(self.index_path)
+            self._log_ino = self.log_path.stat().st_ino
+            self._log_offset = 0
+            if was_synced:
+                self._catalog.synced_version = self._snap_sig
+
+    def _read_item(self, item_id: str) -> dict[str, Any] | None:
+        for p in self._item_paths(item_id):
+            try:
+                data = p.read_bytes()
+            except FileNotFoundError:
+                continue
+            return loads(data)
+        return None
+
+    def get_item(self, item_id: str) -> dict[str, Any] | None:
+        return self._read_item(item_id)
+
+    def item_version(self, item_id: str) -> str | None:
+        """
+        Validator for one item that changes on every write (the item file is
+        replaced each time), from a stat() alone. None if the item doesn't exist.
+        """
+        for p in self._item_paths(item_id):
+            sig = _stat_sig(p)
+            if sig:
+                return ".".join(map(str, sig))
+        return None
+
+    def generation(self) -> str:
+        """
+        Validator for the whole collection: changes whenever any book is written,
+        by this process or another one. Built from committed state only (snapshot
+        signature, log position), so every process on the data_root agrees on it;
+        index entries still waiting for a group commit are counted on top. Costs
+        two stat() calls in a quiet store.
+        """
+        self._load_index()
+        with self._index_lock:
+            parts = [*self._snap_sig, self._log_ino, self._log_offset]
+        pending = len(self._group["entries"])
+        if pending:
+            parts.append(f"p{pending}")
+        return ".".join(map(str, parts))
+
+    def item_ids(self) -> list[str]:
+        """
+        Every item id, from the identifier index (no directory listing).
+        """
+        idx = self._load_index()
+        with self._index_lock:
+            return sorted(set(idx["by_identifier"].values()))
+
+    def _other_layout_files(self) -> Iterator[Path]:
+        if self.sharded:
+            with os.scandir(self.items_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(".json") and entry.is_file():
+                        yield Path(entry.path)
+        else:
+            yield from self.items_dir.glob("*/*/*.json")
+
+    def needs_migration(self) -> bool:
+        """
+        True while item files remain in the other layout. Stops at the first one found.
+        """
+        self.ensure()
+        return next(self._other_layout_files(), None) is not None
+
+    def migrate_layout(
+        self,
+        *,
+        chunk_size: int = MIGRATE_CHUNK,
+        on_moved: Callable[[str], None] | None = None,
+        cancelled: Callable[[], bool] | None = None,
+    ) -> int:
+        """
+        Move item files from the other layout into this store's one, chunk_size
+        files per write-lock hold so upserts keep flowing in between. Reads find
+        items in either layout throughout, so this can run while the app serves.
+        Returns the number of files moved.
+        """
+        self.ensure()
+        moved = 0
+        while not (cancelled and cancelled()):
+            # directory listings may skip entries renamed away mid-scan: rescan until a pass moves nothing
+            before = moved
+            files = self._other_layout_files()
+            while not (cancelled and cancelled()):
+                chunk = [p for _, p in zip(range(max(1, chunk_size)), files)]
+                if not chunk:
+                    break
+                with self._write_lock():
+                    for src in chunk:
+                        item_id = src.stem
+                        dst = self.item_path(item_id)
+                        try:
+                            if dst.exists():
+                                # a write already landed in the new layout; the old copy is stale
+                                src.unlink()
+                            else:
+                                dst.parent.mkdir(parents=True, exist_ok=True)
+                                os.replace(src, dst)
+                        except FileNotFoundError:
+                            continue  # moved by another migrator
+                        moved += 1
+                        if on_moved:
+                            on_moved(item_id)
+            if moved == before:
+                break
+        return moved
+
+    @property
+    def snapshots_dir(self) -> Path:
+        return self.data_root / "snapshots"
+
+    def iter_snapshot(self) -> Iterator[dict[str, Any]]:
+        """
+        Stream every book as of one instant, for export. Under the write lock
+        each item file is hard-linked into a private directory (writers replace
+        files, so the links keep the old versions), then read from there while
+        writers carry on. Unreadable item files are skipped.
+        """
+        self.ensure()
+        self.snapshots_dir.mkdir(parents=True, exist_ok=True)
+        self._drop_stale_snapshots()
+        snap = Path(tempfile.mkdtemp(prefix="export-", dir=self.snapshots_dir))
+        try:
+            with self._write_lock():
+                ids = self.item_ids()
+                for n, item_id in enumerate(ids):
+                    _link_or_copy(self._item_paths(item_id)[:2], snap / f"{n}.json")
+
+            for n in range(len(ids)):
+                try:
+                    obj = loads((snap / f"{n}.json").read_bytes())
+                except (FileNotFoundError, ValueError):
+                    continue
+                if isinstance(obj, dict):
+                    yield obj
+        finally:
+            shutil.rmtree(snap, ignore_errors=True)
+
+    def _drop_stale_snapshots(self) -> None:
+        cutoff = time.time() - SNAPSHOT_STALE_SECONDS
+        for d in self.snapshots_dir.iterdir():
+            try:
+                if d.stat().st_mtime < cutoff:
+                    shutil.rmtree(d, ignore_errors=True)
+            except FileNotFoundError:
+                continue
 
     def get_by_identifier(self, kind: str, value: str) -> dict[str, Any] | None:
         idx = self._load_index()
         item_id = idx.get("by_identifier", {}).get(f"{kind}:{value}")
         if not item_id:
             return None
-        p = self.items_dir / f"{item_id}.json"
-        return json.loads(p.read_text(encoding="utf-8")) if p.exists() else None
+        return self._read_item(item_id)
+
+    def _synced_catalog(self) -> Catalog:
+        """
+        Catalog caught up with the store. Built from every item on first use
+        (and after another process compacts the index); afterwards only items
+        named in newly replayed log entries are re-read.
+        """
+        catalog = self._catalog
+        idx = self._load_index()
+
+        with catalog.lock:
+            with self._index_lock:
+                snap_sig = self._snap_sig
+                if catalog.synced_version != snap_sig:
+                    todo = set(idx["by_identifier"].values())
+                else:
+                    todo = catalog.dirty
+                catalog.dirty = set()
+
+            for item_id in todo:
+                try:
+                    obj = self._read_item(item_id)
+                except Exception:
+                    continue
+                if obj is not None:
+                    catalog.put(obj)
+            catalog.synced_version = snap_sig
+        return catalog
+
+    def list_page(
+        self,
+        limit: int,
+        after: tuple[str, str] | None = None,
+        summary: bool = False,
+        filters: dict[str, Any] | None = None,
+    ) -> tuple[list[dict[str, Any]], tuple[str, str] | None]:
+        """
+        Newest-first page of books strictly after the (added_at, id) cursor.
+        Returns (items, next_cursor); next_cursor is None on the last page.
+        With summary=True the page comes from the catalog's summary projection
+        and no item file is opened. filters (author, publisher, genre, language,
+        year_from, year_to) are answered from the catalog's posting lists, so only
+        matching items are read.
+        """
+        if summary:
+            return self._synced_catalog().summary_page(limit, after, filters)
+
+        out: list[dict[str, Any]] = []
+        for key in self._synced_catalog().iter_desc(after, filters):
+            try:
+                obj = self._read_item(key[1])
+            except Exception:
+                continue
+            if obj is None:
+                continue
+            out.append(obj)
+            if len(out) >= limit:
+                return out, listing_key(obj)
+        return out, None
+
+    def _write_item(self, merged: dict[str, Any]) -> None:
+        """
+        Write in this store's layout and drop any copy left in the other one,
+        so a later migrate_layout() can never move a stale version over it.
+        Callers hold the write lock.
+        """
+        item_id = merged["id"]
+        path = self.item_path(item_id)
+        if self.sharded:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        _atomic_write(path, dumps_bytes(merged), fsync=self.durability == "fsync")
+        self.item_path(item_id, not self.sharded).unlink(missing_ok=True)
 
     def upsert_book(self, book: dict[str, Any]) -> dict[str, Any]:
+        return self.upsert_changes([book])[0][0]
+
+    def upsert_changes(self, books: list[dict[str, Any]]) -> list[tuple[dict[str, Any], bool]]:
+        """
+        Upsert books and report, in input order, (stored record, changed).
+        Unchanged books are not rewritten; the index is committed once per call.
+        """
         self.ensure()
+        keys = [book_identifier(book) for book in books]
 
-        idents = book.get("identifiers") or {}
-        if "isbn" in idents:
-            kind, value = "isbn", idents["isbn"]
-        elif "asin" in idents:
-            kind, value = "asin", idents["asin"]
-        else:
-            raise ValueError("book.identifiers must include isbn or asin")
+        with self._write_lock():
+            # the index is re-synced under the lock, so writes by other processes are merged onto
+            by_ident = self._load_index()["by_identifier"]
+            now = utc_now_iso()
+            staged: dict[str, dict[str, Any]] = {}
+            original: dict[str, dict[str, Any] | None] = {}
 
-        idx = self._load_index()
-        by_ident = idx.setdefault("by_identifier", {})
-        ident_key = f"{kind}:{value}"
-
-        existing_id = by_ident.get(ident_key)
-        now = utc_now_iso()
-
-        if existing_id:
-            item_id = existing_id
-            existing = self.get_by_identifier(kind, value) or {}
-            merged = {**existing, **book}
-            merged["updated_at"] = now
-            merged.setdefault("added_at", existing.get("added_at") or now)
-            merged.setdefault("id", item_id)
-        else:
-            title = book.get("title") or f"book-{value}"
-            item_id = f"book_{kind}_{value}_{safe_slug(title)[:32]}"
-            merged = {**book, "id": item_id, "added_at": now, "updated_at": now}
+            for book, (kind, value) in zip(books, keys):
+                ident_key = f"{kind}:{value}"
+                if ident_key in staged:
+                    existing = staged[ident_key]
+                    existing_id = existing["id"]
+                else:
+                    existing_id = by_ident.get(ident_key)
+                    existing = (self._read_item(existing_id) or {}) if existing_id else None
+                    original[ident_key] = existing
+                staged[ident_key] = merge_stored_book(book, kind, value, existing_id, existing, now)
 
-        path = self.items_dir / f"{item_id}.json"
-        tmp = path.with_suffix(".json.tmp")
-        tmp.write_text(json.dumps(merged, indent=2, ensure_ascii=False), encoding="utf-8")
-        os.replace(tmp, path)
+            changed = {
+                k: original[k] is None or content_hash(merged) != content_hash(original[k])
+                for k, merged in staged.items()
+            }
+            written = [merged for k, merged in staged.items() if changed[k]]
 
-        by_ident[ident_key] = item_id
-        self._save_index(idx)
+            for merged in written:
+                self._write_item(merged)
 
-        return merged
+            entries = [(k, merged["id"]) for k, merged in staged.items() if changed[k]]
+            with self._index_lock:
+                for k, item_id in entries:
+                    by_ident[k] = item_id
+            group = None
+            if getattr(self._batch, "entries", None) is not None:
+                self._batch.entries.extend(entries)
+            elif len(entries) >= SNAPSHOT_COMMIT_MIN:
+                self.compact(item_id for _k, item_id in entries)
+            elif entries and self.commit_window_ms > 0:
+                group = self._enqueue_commit(entries)
+            elif entries:
+                self._append_index_entries(entries)
+
+            # under the lock, so the catalog and listeners see each book's writes in commit order
+            for merged in written:
+                self._after_write(merged)
+
+        if group is not None and self.durability != "async":
+            if not group["done"].is_set():
+                # whoever gets the write lock first commits the group, writers that queued meanwhile included
+                self.flush()
+            group["done"].wait()
+            if group["error"] is not None:
+                raise OSError(f"Index commit failed: {group['error']}") from group["error"]
+
+        out = []
+        for kind, value in keys:
+            k = f"{kind}:{value}"
+            out.append((staged[k], True) if changed[k] else (original[k], False))
+        return out
@@ -0,0 +1,204 @@
+# stores/catalog.py
+from __future__ import annotations
+import heapq
+import threading
+from bisect import bisect_left, insort
+from typing import Any, Iterator
+
+from stores.field_index import FieldIndex
+from stores.search_index import SearchIndex, top_hits
+
+# Keys handed out per lock acquisition by Catalog.iter_desc().
+_ITER_CHUNK = 64
+# Filtered iter_desc() walks the presorted order, skipping non-matches, once at
+# least 1/_DENSE_MATCH of the catalog matches; sparser sets are heap-selected.
+_DENSE_MATCH = 16
+
+# Top-level fields kept in the listing summary projection (what the library grid shows).
+SUMMARY_FIELDS = (
+    "id",
+    "type",
+    "identifiers",
+    "title",
+    "subtitle",
+    "authors",
+    "publish_date",
+    "cover_image",
+    "added_at",
+    "updated_at",
+)
+
+
+def listing_key(book: dict[str, Any]) -> tuple[str, str]:
+    """
+    Sort/cursor key for the library listing: (added_at, id).
+    """
+    return (book.get("added_at") or "", book.get("id") or "")
+
+
+def summarize_book(book: dict[str, Any]) -> dict[str, Any]:
+    """
+    Compact listing view of a book: SUMMARY_FIELDS only, missing ones omitted.
+    """
+    return {k: book[k] for k in SUMMARY_FIELDS if k in book}
+
+
+class Catalog:
+    """
+    In-memory projections of a store, kept in sync by upsert_book so list
+    queries never have to open every item file.
+
+    - order: (added_at, id) keys, presorted ascending
+    - summaries: summarize_book() of every item, served by list/search summary views
+    - search: inverted full-text index
+    - fields: author/publisher/genre/language/year posting lists for filters
+
+    `synced_version` and `dirty` belong to the owning store: they record how far
+    the catalog has caught up with the store's change feed. `version` counts
+    puts, so it moves whenever anything the catalog serves may have changed.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.RLock()
+        self.synced_version: Any = None
+        self.dirty: set[str] = set()
+        self.version = 0
+        self._order: list[tuple[str, str]] = []
+        self._keys: dict[str, tuple[str, str]] = {}
+        self._summaries: dict[str, dict[str, Any]] = {}
+        self._search = SearchIndex()
+        self._fields = FieldIndex()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._keys
+
+    def put(self, book: dict[str, Any]) -> None:
+        key = listing_key(book)
+        with self.lock:
+            self.version += 1
+            self._search.put(key[1], book)
+            self._fields.put(key[1], book)
+            self._summaries[key[1]] = summarize_book(book)
+            old = self._keys.get(key[1])
+            if old == key:
+                return
+            if old is not None:
+                del self._order[bisect_left(self._order, old)]
+            insort(self._order, key)
+            self._keys[key[1]] = key
+
+    def summary(self, item_id: str) -> dict[str, Any] | None:
+        return self._summaries.get(item_id)
+
+    def summary_page(
+        self,
+        limit: int,
+        after: tuple[str, str] | None = None,
+        filters: dict[str, Any] | None = None,
+    ) -> tuple[list[dict[str, Any]], tuple[str, str] | None]:
+        """
+        Newest-first page of summaries strictly after the (added_at, id) cursor,
+        served entirely from memory. Returns (items, next_cursor).
+        """
+        out: list[dict[str, Any]] = []
+        for key in self.iter_desc(after, filters):
+            summary = self._summaries.get(key[1])
+            if summary is None:
+                continue
+            out.append(summary)
+            if len(out) >= limit:
+                return out, key
+        return out, None
+
+    def match(self, filters: dict[str, Any]) -> set[str]:
+        """
+        Ids passing every filter (see FieldIndex.match).
+        """
+        with self.lock:
+            return self._fields.match(filters)
+
+    def facets(
+        self,
+        query: str = "",
+        filters: dict[str, Any] | None = None,
+        limit: int = 20,
+    ) -> dict[str, list[dict[str, Any]]]:
+        """
+        Facet counts for the whole catalog, or for the items matching the
+        query and/or filters.
+        """
+        with self.lock:
+            if not query and not filters:
+                return self._fields.facets(None, limit)
+            ids = self._fields.match(filters) if filters else None
+            if query:
+                hits = self._search.scores(query).keys()
+                ids = set(hits) if ids is None else ids & hits
+            return self._fields.facets(ids, limit)
+
+    def search(
+        self,
+        query: str,
+        filters: dict[str, Any] | None = None,
+        limit: int | None = None,
+    ) -> tuple[list[tuple[str, float]], int]:
+        """
+        (best `limit` hits as (item_id, score), total number of hits).
+        """
+        with self.lock:
+            scores = self._search.scores(query)
+            if filters:
+                ids = self._fields.match(filters)
+                scores = {i: s for i, s in scores.items() if i in ids}
+        return top_hits(scores, limit), len(scores)
+
+    def iter_desc(
+        self,
+        before: tuple[str, str] | None = None,
+        filters: dict[str, Any] | None = None,
+    ) -> Iterator[tuple[str, str]]:
+        """
+        Keys newest first, strictly older than `before` when given.
+        Re-bisects per chunk so concurrent puts never skip or repeat a key.
+        With filters, the matching ids are fixed when iteration starts. A large
+        match set is served by walking the presorted order and skipping the
+        rest; a small one by picking the next chunk of its newest keys below
+        the cursor, so no request sorts the whole match set.
+        """
+        ids = None
+        if filters:
+            with self.lock:
+                ids = self._fields.match(filters)
+                dense = len(ids) * _DENSE_MATCH >= len(self._order)
+            if not dense:
+                yield from self._iter_desc_sparse(before, ids)
+                return
+
+        cursor = before
+        while True:
+            with self.lock:
+                hi = len(self._order) if cursor is None else bisect_left(self._order, cursor)
+                chunk = self._order[max(0, hi - _ITER_CHUNK):hi]
+            if not chunk:
+                return
+            if ids is None:
+                yield from reversed(chunk)
+            else:
+                yield from (key for key in reversed(chunk) if key[1] in ids)
+            cursor = chunk[0]
+
+    def _iter_desc_sparse(self, before: tuple[str, str] | None, ids: set[str]) -> Iterator[tuple[str, str]]:
+        cursor = before
+        while True:
+            with self.lock:
+                keys = (self._keys.get(i) for i in ids)
+                chunk = heapq.nlargest(
+                    _ITER_CHUNK, (k for k in keys if k is not None and (cursor is None or k < cursor))
+                )
+            if not chunk:
+                return
+            yield from chunk
+            cursor = chunk[-1]
@@ -0,0 +1,82 @@
+# stores/catalog_store.py
+from __future__ import annotations
+from typing import Any, Callable
+
+from stores.catalog import Catalog
+
+
+class CatalogStoreMixin:
+    """
+    Catalog-backed search, facets and write listeners shared by BookStore and
+    SqliteBookStore. The store provides _catalog, _listeners, _synced_catalog(),
+    get_item() and upsert_changes().
+    """
+    _catalog: Catalog
+    _listeners: list
+
+    def subscribe(self, fn: Callable[[dict[str, Any]], None]) -> None:
+        """
+        Call fn(saved_book) after every upsert (e.g. cover prefetch).
+        Listeners run under the write lock, in write order: hand slow work
+        off to a thread. Errors are logged, never raised into the writer.
+        """
+        self._listeners.append(fn)
+
+    def _notify(self, book: dict[str, Any]) -> None:
+        for fn in self._listeners:
+            try:
+                fn(book)
+            except Exception as e:
+                print(f"Store listener {fn!r} failed: {e}")
+
+    def _after_write(self, merged: dict[str, Any]) -> None:
+        if self._catalog.synced_version is not None:
+            self._catalog.put(merged)
+        self._notify(merged)
+
+    def upsert_many(self, books: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        Upsert many books in one commit; see upsert_changes().
+        """
+        return [record for record, _changed in self.upsert_changes(books)]
+
+    def facets(
+        self,
+        query: str = "",
+        filters: dict[str, Any] | None = None,
+        limit: int = 20,
+    ) -> dict[str, list[dict[str, Any]]]:
+        """
+        Genre / language / publisher / decade counts from the catalog, library-wide
+        or scoped to a search query and filters. No item is read.
+        """
+        return self._synced_catalog().facets(query, filters, limit)
+
+    def search(
+        self,
+        query: str,
+        limit: int,
+        offset: int = 0,
+        summary: bool = False,
+        filters: dict[str, Any] | None = None,
+    ) -> tuple[list[dict[str, Any]], int]:
+        """
+        Ranked full-text search. Returns (page of items, total number of hits).
+        With summary=True the items are catalog summaries instead of full documents.
+        filters (author, publisher, genre, language, year_from, year_to) narrow the hits.
+        """
+        catalog = self._synced_catalog()
+        hits, total = catalog.search(query, filters, offset + limit)
+        if summary:
+            page = (catalog.summary(item_id) for item_id, _score in hits[offset:])
+            return [s for s in page if s is not None], total
+
+        out: list[dict[str, Any]] = []
+        for item_id, _score in hits[offset:]:
+            try:
+                obj = self.get_item(item_id)
+            except Exception:
+                continue  # unreadable item: skip it, the rest of the page still renders
+            if obj is not None:
+                out.append(obj)
+        return out, total
@@ -0,0 +1,181 @@
+# stores/field_index.py
+from __future__ import annotations
+import re
+from bisect import bisect_left, bisect_right, insort
+from typing import Any
+
+from stores.search_index import tokenize
+
+# Exact-value fields with a posting list each: filter name -> book key.
+FILTER_FIELDS = {
+    "author": "authors",
+    "publisher": "publishers",
+    "genre": "genres",
+    "language": "language",
+}
+
+# Facets reported by FieldIndex.facets(); "decade" is derived from the publish year.
+FACETS = ("genre", "language", "publisher", "decade")
+
+_YEAR_RE = re.compile(r"\b(\d{4})\b")
+
+
+def fold_value(value: str) -> str:
+    """
+    Match key for an exact field value: case- and accent-insensitive, punctuation ignored.
+    """
+    return " ".join(tokenize(value))
+
+
+def publish_year(book: dict[str, Any]) -> int | None:
+    m = _YEAR_RE.search(str(book.get("publish_date") or ""))
+    return int(m.group(1)) if m else None
+
+
+def _top(counts: dict[Any, int], labels: dict[Any, Any], limit: int) -> list[dict[str, Any]]:
+    ranked = sorted(counts.items(), key=lambda kv: (-kv[1], str(labels.get(kv[0], kv[0]))))
+    return [{"value": labels.get(k, k), "count": n} for k, n in ranked[:limit]]
+
+
+def _field_values(book: dict[str, Any], key: str) -> dict[str, str]:
+    """
+    {folded value: display value} for one field (a string or a list of strings).
+    """
+    v = book.get(key)
+    if isinstance(v, str):
+        raw = [v]
+    elif isinstance(v, list):
+        raw = [x for x in v if isinstance(x, str)]
+    else:
+        raw = []
+
+    out: dict[str, str] = {}
+    for s in raw:
+        folded = fold_value(s)
+        if folded:
+            out.setdefault(folded, s.strip())
+    return out
+
+
+class FieldIndex:
+    """
+    Secondary posting lists: folded value -> item ids for each FILTER_FIELDS
+    entry, plus publish year -> item ids with the years kept sorted for range
+    queries, plus per-decade counters. Updated by diffing an item's old and new
+    values, so a posting list's size is that value's facet count. Not
+    thread-safe on its own; Catalog serializes access.
+    """
+
+    def __init__(self) -> None:
+        self._postings: dict[str, dict[str, set[str]]] = {f: {} for f in FILTER_FIELDS}
+        self._labels: dict[str, dict[str, str]] = {f: {} for f in FILTER_FIELDS}
+        self._years: dict[int, set[str]] = {}
+        self._year_keys: list[int] = []  # sorted
+        self._decades: dict[int, int] = {}
+        self._doc_values: dict[str, tuple[dict[str, frozenset[str]], int | None]] = {}
+
+    def put(self, item_id: str, book: dict[str, Any]) -> None:
+        values: dict[str, frozenset[str]] = {}
+        for name, key in FILTER_FIELDS.items():
+            found = _field_values(book, key)
+            values[name] = frozenset(found)
+            self._labels[name].update(found)
+        year = publish_year(book)
+
+        old_values, old_year = self._doc_values.get(item_id, ({}, None))
+        for name, new in values.items():
+            old = old_values.get(name, frozenset())
+            postings = self._postings[name]
+            for v in old - new:
+                ids = postings[v]
+                ids.discard(item_id)
+                if not ids:
+                    del postings[v]
+                    del self._labels[name][v]
+            for v in new - old:
+                postings.setdefault(v, set()).add(item_id)
+
+        if year != old_year:
+            if old_year is not None:
+                ids = self._years[old_year]
+                ids.discard(item_id)
+                if not ids:
+                    del self._years[old_year]
+                    del self._year_keys[bisect_left(self._year_keys, old_year)]
+                decade = old_year // 10 * 10
+                self._decades[decade] -= 1
+                if not self._decades[decade]:
+                    del self._decades[decade]
+            if year is not None:
+                if year not in self._years:
+                    self._years[year] = set()
+                    insort(self._year_keys, year)
+                self._years[year].add(item_id)
+                decade = year // 10 * 10
+                self._decades[decade] = self._decades.get(decade, 0) + 1
+
+        self._doc_values[item_id] = (values, year)
+
+    def lookup(self, name: str, value: str) -> set[str]:
+        return self._postings[name].get(fold_value(value), set())
+
+    def year_range(self, year_from: int | None, year_to: int | None) -> set[str]:
+        lo = 0 if year_from is None else bisect_left(self._year_keys, year_from)
+        hi = len(self._year_keys) if year_to is None else bisect_right(self._year_keys, year_to)
+        out: set[str] = set()
+        for year in self._year_keys[lo:hi]:
+            out |= self._years[year]
+        return out
+
+    def facets(self, ids: set[str] | None = None, limit: int = 20) -> dict[str, list[dict[str, Any]]]:
+        """
+        Top `limit` values per FACETS entry as [{"value", "count"}], most frequent first.
+        Library-wide counts come straight from the maintained counters; with `ids`
+        (e.g. search hits) only those items' values are tallied.
+        """
+        counts: dict[str, dict[Any, int]] = {}
+        if ids is None:
+            for name in FACETS:
+                if name == "decade":
+                    counts[name] = dict(self._decades)
+                else:
+                    counts[name] = {v: len(s) for v, s in self._postings[name].items()}
+        else:
+            counts = {name: {} for name in FACETS}
+            for item_id in ids:
+                doc = self._doc_values.get(item_id)
+                if doc is None:
+                    continue
+                values, year = doc
+                for name in FACETS:
+                    if name == "decade":
+                        if year is not None:
+                            c = counts[name]
+                            c[year // 10 * 10] = c.get(year // 10 * 10, 0) + 1
+                        continue
+                    c = counts[name]
+                    for v in values[name]:
+                        c[v] = c.get(v, 0) + 1
+
+        return {
+            name: _top(counts[name], {} if name == "decade" else self._labels[name], limit)
+            for name in FACETS
+        }
+
+    def match(self, filters: dict[str, Any]) -> set[str]:
+        """
+        Ids matching every filter: FILTER_FIELDS names with a value, and/or
+        year_from / year_to (inclusive). Smallest posting list first.
+        """
+        sets = [self.lookup(name, filters[name]) for name in FILTER_FIELDS if filters.get(name)]
+        if filters.get("year_from") is not None or filters.get("year_to") is not None:
+            sets.append(self.year_range(filters.get("year_from"), filters.get("year_to")))
+        if not sets:
+            return set(self._doc_values)
+        sets.sort(key=len)
+        out = set(sets[0])
+        for s in sets[1:]:
+            if not out:
+                break
+            out &= s
+        return out
@@ -0,0 +1,240 @@
+# stores/search_index.py
+from __future__ import annotations
+import heapq
+import math
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Any
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Term weight per indexed field (acts as a tf multiplier).
+FIELD_WEIGHTS = {
+    "title": 3.0,
+    "subtitle": 2.0,
+    "authors": 2.0,
+    "publishers": 1.0,
+    "genres": 1.0,
+    "subjects": 1.0,
+}
+
+# A query term expands to at most this many vocabulary tokens sharing its prefix.
+MAX_PREFIX_EXPANSION = 64
+# Shorter query terms (typically the first keystrokes) expand only to their
+# SHORT_PREFIX_EXPANSION most frequent tokens, and no further once those cover
+# SHORT_PREFIX_MAX_POSTINGS items: the full prefix range hits most of the library.
+MIN_PREFIX_LEN = 3
+SHORT_PREFIX_EXPANSION = 8
+SHORT_PREFIX_MAX_POSTINGS = 20000
+# Prefix (non-exact) hits count for less than exact token hits.
+PREFIX_PENALTY = 0.5
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Lowercased, accent-folded word tokens.
+    """
+    if not text:
+        return []
+    folded = unicodedata.normalize("NFKD", text)
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch))
+    return _TOKEN_RE.findall(folded.lower())
+
+
+def _field_texts(book: dict[str, Any]) -> dict[str, list[str]]:
+    def strs(v) -> list[str]:
+        if isinstance(v, str):
+            return [v]
+        if isinstance(v, list):
+            return [x for x in v if isinstance(x, str)]
+        return []
+
+    subjects = book.get("subjects") or {}
+    subject_texts: list[str] = []
+    if isinstance(subjects, dict):
+        for v in subjects.values():
+            subject_texts += strs(v)
+    else:
+        subject_texts = strs(subjects)
+
+    return {
+        "title": strs(book.get("title")),
+        "subtitle": strs(book.get("subtitle")),
+        "authors": strs(book.get("authors")),
+        "publishers": strs(book.get("publishers")),
+        "genres": strs(book.get("genres")),
+        "subjects": subject_texts,
+    }
+
+
+def top_hits(scores: dict[str, float], limit: int | None = None) -> list[tuple[str, float]]:
+    """
+    (item_id, score) best first (ties by id); a heap picks the best `limit`
+    instead of sorting every hit.
+    """
+    if limit is None or limit >= len(scores):
+        return sorted(scores.items(), key=_rank)
+    return heapq.nsmallest(max(0, limit), scores.items(), key=_rank)
+
+
+def _rank(kv: tuple[str, float]) -> tuple[float, str]:
+    return (-kv[1], kv[0])
+
+
+class SearchIndex:
+    """
+    Token-level inverted index over title/subtitle/authors/publishers/genres/subjects
+    with prefix matching and BM25 ranking. Not thread-safe on its own; Catalog
+    serializes access.
+    """
+
+    def __init__(self) -> None:
+        self._postings: dict[str, dict[str, float]] = {}  # token -> {item_id: weighted tf}
+        self._doc_terms: dict[str, dict[str, float]] = {}  # item_id -> {token: weighted tf}
+        self._doc_len: dict[str, float] = {}
+        self._vocab: list[str] = []  # sorted, for prefix ranges
+        self._short: dict[str, list[str]] = {}  # short prefix -> most frequent tokens; reset on vocab changes
+        self._total_len = 0.0
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def put(self, item_id: str, book: dict[str, Any]) -> None:
+        terms: dict[str, float] = {}
+        for fname, texts in _field_texts(book).items():
+            w = FIELD_WEIGHTS[fname]
+            for text in texts:
+                for tok in tokenize(text):
+                    terms[tok] = terms.get(tok, 0.0) + w
+
+        if self._doc_terms.get(item_id) == terms:
+            return
+        self.remove(item_id)
+
+        for tok, tf in terms.items():
+            posting = self._postings.get(tok)
+            if posting is None:
+                posting = self._postings[tok] = {}
+                insort(self._vocab, tok)
+                self._short.clear()
+            posting[item_id] = tf
+
+        dl = sum(terms.values())
+        self._doc_terms[item_id] = terms
+        self._doc_len[item_id] = dl
+        self._total_len += dl
+
+    def remove(self, item_id: str) -> None:
+        terms = self._doc_terms.pop(item_id, None)
+        if terms is None:
+            return
+        for tok in terms:
+            posting = self._postings.get(tok)
+            if posting is None:
+                continue
+            posting.pop(item_id, None)
+            if not posting:
+                del self._postings[tok]
+                del self._vocab[bisect_left(self._vocab, tok)]
+                self._short.clear()
+        self._total_len -= self._doc_len.pop(item_id, 0.0)
+
+    def _expand(self, term: str) -> list[tuple[str, float]]:
+        """
+        Vocabulary tokens matching `term` exactly or by prefix, with their weight.
+        """
+        out = []
+        if term in self._postings:
+            out.append((term, 1.0))
+        if len(term) < MIN_PREFIX_LEN:
+            common = self._short.get(term)
+            if common is None:
+                lo = bisect_left(self._vocab, term)
+                hi = bisect_left(self._vocab, term + "\U0010ffff", lo)
+                ranked = heapq.nlargest(
+                    SHORT_PREFIX_EXPANSION,
+                    (tok for tok in self._vocab[lo:hi] if tok != term),
+                    key=lambda tok: len(self._postings[tok]),
+                )
+                common, covered = [], len(self._postings.get(term, ()))
+                for tok in ranked:
+                    if common and covered + len(self._postings[tok]) > SHORT_PREFIX_MAX_POSTINGS:
+                        break
+                    common.append(tok)
+                    covered += len(self._postings[tok])
+                self._short[term] = common
+            return out + [(tok, PREFIX_PENALTY) for tok in common]
+        i = bisect_left(self._vocab, term)
+        while i < len(self._vocab) and len(out) < MAX_PREFIX_EXPANSION:
+            tok = self._vocab[i]
+            if not tok.startswith(term):
+                break
+            if tok != term:
+                out.append((tok, PREFIX_PENALTY))
+            i += 1
+        return out
+
+    def search(self, query: str, limit: int | None = None) -> list[tuple[str, float]]:
+        """
+        (item_id, score) best first, only the best `limit` when given.
+        Every query term must match (exactly or as a prefix).
+        """
+        return top_hits(self.scores(query), limit)
+
+    def scores(self, query: str) -> dict[str, float]:
+        """
+        {item_id: BM25 score} of every hit, unordered.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        n = len(self._doc_terms)
+        if not terms or not n:
+            return {}
+
+        avgdl = self._total_len / n or 1.0
+        expansions = [self._expand(t) for t in terms]
+        if any(not e for e in expansions):
+            return {}
+
+        # intersect starting from the rarest term
+        expansions.sort(key=lambda e: sum(len(self._postings[tok]) for tok, _ in e))
+
+        doc_len = self._doc_len
+        # BM25 length norm K1 * (1 - B + B * dl / avgdl) as norm_base + norm_scale * dl
+        norm_base, norm_scale = K1 * (1.0 - B), K1 * B / avgdl
+        scores: dict[str, float] | None = None
+
+        for exp in expansions:
+            term_scores: dict[str, float] = {}
+            for tok, boost in exp:
+                posting = self._postings[tok]
+                df = len(posting)
+                weight = boost * math.log(1.0 + (n - df + 0.5) / (df + 0.5)) * (K1 + 1.0)
+                if scores is None:
+                    pairs = posting.items()
+                elif len(scores) < df:
+                    # later terms only score items still in the running, whichever side is smaller
+                    pairs = ((i, posting[i]) for i in scores if i in posting)
+                else:
+                    pairs = ((i, tf) for i, tf in posting.items() if i in scores)
+                tok_scores = {i: weight * tf / (tf + norm_base + norm_scale * doc_len[i]) for i, tf in pairs}
+                if not term_scores:
+                    term_scores = tok_scores
+                    continue
+                # a doc matching several expansions of the term counts its best one
+                for item_id, s in tok_scores.items():
+                    if s > term_scores.get(item_id, 0.0):
+                        term_scores[item_id] = s
+
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {i: scores[i] + s for i, s in term_scores.items()}
+            if not scores:
+                return {}
+
+        return scores or {}
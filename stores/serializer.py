@@ -0,0 +1,55 @@
+# stores/serializer.py
+from __future__ import annotations
+import json
+from typing import Any, Callable
+
+from config import JSON_PRETTY
+
+try:  # optional: C-backed encoder/decoder, several times faster than the stdlib
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+def dumps_bytes(
+    obj: Any,
+    *,
+    pretty: bool | None = None,
+    sort_keys: bool = False,
+    default: Callable[[Any], Any] | None = None,
+) -> bytes:
+    """
+    UTF-8 JSON for obj. Compact unless pretty (default: JSON_PRETTY, for
+    hand-inspecting data files). Uses orjson when installed and falls back to
+    the stdlib for anything orjson refuses (e.g. ints beyond 64 bits).
+    """
+    if pretty is None:
+        pretty = JSON_PRETTY
+
+    if orjson is not None:
+        option = (orjson.OPT_INDENT_2 if pretty else 0) | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        try:
+            return orjson.dumps(obj, default=default, option=option)
+        except TypeError:  # orjson.JSONEncodeError
+            pass
+
+    if pretty:
+        text = json.dumps(obj, indent=2, ensure_ascii=False, sort_keys=sort_keys, default=default)
+    else:
+        text = json.dumps(obj, separators=(",", ":"), ensure_ascii=False, sort_keys=sort_keys, default=default)
+    return text.encode("utf-8")
+
+
+def dumps(obj: Any, **kwargs: Any) -> str:
+    return dumps_bytes(obj, **kwargs).decode("utf-8")
+
+
+def loads(data: str | bytes) -> Any:
+    """
+    Parse JSON text or UTF-8 bytes. Raises ValueError on malformed input.
+    """
+    if orjson is not None:
+        return orjson.loads(data)  # orjson.JSONDecodeError subclasses ValueError
+    return json.loads(data)
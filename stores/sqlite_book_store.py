@@ -0,0 +1,316 @@
+# stores/sqlite_book_store.py
+from __future__ import annotations
+import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator
+
+from config import COMMIT_DURABILITY
+from stores.book_store import DURABILITY_MODES, book_identifier, content_hash, merge_stored_book, project_root_from_here, utc_now_iso
+from stores.catalog import Catalog, listing_key
+from stores.catalog_store import CatalogStoreMixin
+from stores.serializer import dumps, loads
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    id          TEXT PRIMARY KEY,
+    ident_key   TEXT NOT NULL UNIQUE,
+    added_at    TEXT NOT NULL,
+    updated_at  TEXT NOT NULL,
+    doc         TEXT NOT NULL,
+    rev         INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS books_added_at ON books (added_at, id);
+"""
+
+# Applied after _SCHEMA to databases created before the column existed.
+_MIGRATIONS = (
+    ("rev", "ALTER TABLE books ADD COLUMN rev INTEGER NOT NULL DEFAULT 0"),
+)
+
+# BookStore durability modes -> PRAGMA synchronous. Never OFF: that risks a corrupt
+# database after a power loss, not just the last few commits. In WAL mode NORMAL
+# can only lose recent commits, which is what "async" allows.
+_SYNCHRONOUS = {"async": "NORMAL", "commit": "NORMAL", "fsync": "FULL"}
+
+
+@dataclass(eq=False)
+class SqliteBookStore(CatalogStoreMixin):
+    """
+    Same contract as BookStore, backed by one SQLite file in WAL mode.
+    Books are kept as JSON documents; identifier and added_at are indexed columns.
+    Every write bumps a store-wide `rev`, which the in-memory Catalog (search)
+    uses to pick up rows written by other processes.
+    """
+    data_root: Path  # e.g. Path(".../data")
+    # "async" | "commit" | "fsync", see _SYNCHRONOUS; each upsert is its own transaction
+    durability: str = COMMIT_DURABILITY
+    # one connection per thread (Flask serves requests on worker threads)
+    _local: threading.local = field(default_factory=threading.local, init=False, repr=False)
+    _catalog: Catalog = field(default_factory=Catalog, init=False, repr=False)
+    _listeners: list = field(default_factory=list, init=False, repr=False)
+    # held from BEGIN IMMEDIATE to the catalog put/notify, so this process applies its writes in commit order
+    _write_mutex: threading.RLock = field(default_factory=threading.RLock, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown commit durability: {self.durability!r} (expected one of {DURABILITY_MODES})")
+
+    @classmethod
+    def default(cls) -> "SqliteBookStore":
+        return cls(project_root_from_here() / "data")
+
+    @property
+    def db_path(self) -> Path:
+        return self.data_root / "library.sqlite3"
+
+    def ensure(self) -> None:
+        self._conn()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.data_root.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA synchronous={_SYNCHRONOUS[self.durability]}")
+            conn.executescript(_SCHEMA)
+            cols = {r[1] for r in conn.execute("PRAGMA table_info(books)")}
+            for col, ddl in _MIGRATIONS:
+                if col not in cols:
+                    conn.execute(ddl)
+            conn.execute("CREATE INDEX IF NOT EXISTS books_rev ON books (rev)")
+            self._local.conn = conn
+        return conn
+
+    def flush(self) -> None:
+        """
+        Nothing to do: every upsert commits its own transaction. Kept for
+        parity with BookStore.flush().
+        """
+
+    def get_by_identifier(self, kind: str, value: str) -> dict[str, Any] | None:
+        row = self._conn().execute(
+            "SELECT doc FROM books WHERE ident_key = ?", (f"{kind}:{value}",)
+        ).fetchone()
+        return loads(row[0]) if row else None
+
+    def get_item(self, item_id: str) -> dict[str, Any] | None:
+        row = self._conn().execute("SELECT doc FROM books WHERE id = ?", (item_id,)).fetchone()
+        return loads(row[0]) if row else None
+
+    def item_version(self, item_id: str) -> str | None:
+        """
+        Validator for one item: its row's rev, bumped on every write. None if missing.
+        """
+        row = self._conn().execute("SELECT rev FROM books WHERE id = ?", (item_id,)).fetchone()
+        return str(row[0]) if row else None
+
+    def generation(self) -> str:
+        """
+        Validator for the whole collection: the highest rev, which moves on every write.
+        """
+        return str(self._conn().execute("SELECT COALESCE(MAX(rev), 0) FROM books").fetchone()[0])
+
+    def item_ids(self) -> list[str]:
+        return [r[0] for r in self._conn().execute("SELECT id FROM books ORDER BY id")]
+
+    def iter_snapshot(self) -> Iterator[dict[str, Any]]:
+        """
+        Stream every book for export from one read transaction on a private
+        connection, so the export is a point-in-time snapshot even while
+        other requests keep writing (WAL readers don't block writers).
+        """
+        self.ensure()
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("BEGIN")
+            for (doc,) in conn.execute("SELECT doc FROM books ORDER BY id"):
+                try:
+                    yield loads(doc)
+                except ValueError:
+                    continue
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def _synced_catalog(self) -> Catalog:
+        """
+        Catalog caught up to the highest rev in the table.
+        """
+        catalog = self._catalog
+        with catalog.lock:
+            since = catalog.synced_version or 0
+            rows = self._conn().execute(
+                "SELECT rev, doc FROM books WHERE rev > ? ORDER BY rev", (since,)
+            ).fetchall()
+            if catalog.synced_version is None:
+                # rows written before the rev column existed all carry rev 0
+                rows += self._conn().execute("SELECT rev, doc FROM books WHERE rev = 0").fetchall()
+            for rev, doc in rows:
+                try:
+                    catalog.put(loads(doc))
+                except ValueError:
+                    continue
+                since = max(since, rev)
+            catalog.synced_version = since
+        return catalog
+
+    def list_page(
+        self,
+        limit: int,
+        after: tuple[str, str] | None = None,
+        summary: bool = False,
+        filters: dict[str, Any] | None = None,
+    ) -> tuple[list[dict[str, Any]], tuple[str, str] | None]:
+        """
+        Newest-first page of books strictly after the (added_at, id) cursor,
+        walked straight off the books_added_at index.
+        With summary=True the page comes from the catalog's summary projection.
+        filters (author, publisher, genre, language, year_from, year_to) select
+        ids from the catalog's posting lists; only those rows are fetched.
+        """
+        if summary:
+            return self._synced_catalog().summary_page(limit, after, filters)
+
+        if filters:
+            out: list[dict[str, Any]] = []
+            for key in self._synced_catalog().iter_desc(after, filters):
+                obj = self.get_item(key[1])
+                if obj is None:
+                    continue
+                out.append(obj)
+                if len(out) >= limit:
+                    return out, listing_key(obj)
+            return out, None
+
+        conn = self._conn()
+        out: list[dict[str, Any]] = []
+        cursor = after
+
+        while True:
+            if cursor is None:
+                rows = conn.execute(
+                    "SELECT added_at, id, doc FROM books ORDER BY added_at DESC, id DESC LIMIT ?",
+                    (limit,),
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT added_at, id, doc FROM books WHERE (added_at, id) < (?, ?) "
+                    "ORDER BY added_at DESC, id DESC LIMIT ?",
+                    (cursor[0], cursor[1], limit),
+                ).fetchall()
+            if not rows:
+                return out, None
+
+            for added_at, item_id, doc in rows:
+                cursor = (added_at, item_id)
+                try:
+                    obj = loads(doc)
+                except ValueError:
+                    continue
+                out.append(obj)
+                if len(out) >= limit:
+                    return out, listing_key(obj)
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Run this thread's upserts in one transaction, committed when the block exits.
+        Catalog updates and listeners run after the commit, in commit order. Nested batches join the outer one.
+        """
+        conn = self._conn()
+        if getattr(self._local, "pending", None) is not None:
+            yield
+            return
+
+        with self._write_mutex:
+            self._local.pending = []
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    yield
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+                for merged in self._local.pending:
+                    self._after_write(merged)
+            finally:
+                self._local.pending = None
+
+    def upsert_book(self, book: dict[str, Any]) -> dict[str, Any]:
+        kind, value = book_identifier(book)
+        ident_key = f"{kind}:{value}"
+        conn = self._conn()
+
+        pending = getattr(self._local, "pending", None)
+        if pending is not None:
+            record, changed = self._write(conn, kind, value, ident_key, book)
+            if changed:
+                pending.append(record)
+            return record
+
+        with self._write_mutex:
+            # IMMEDIATE takes the write lock up front so the read-merge-write is atomic
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                record, changed = self._write(conn, kind, value, ident_key, book)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+            if changed:
+                self._after_write(record)
+        return record
+
+    def upsert_changes(self, books: list[dict[str, Any]]) -> list[tuple[dict[str, Any], bool]]:
+        """
+        Upsert books in one transaction and report, in input order, (stored
+        record, changed). Every book is validated before anything is written.
+        Books whose content (timestamps aside) is unchanged are not rewritten.
+        """
+        keys = [book_identifier(book) for book in books]
+        out = []
+        with self.batch():
+            conn = self._conn()
+            for book, (kind, value) in zip(books, keys):
+                record, changed = self._write(conn, kind, value, f"{kind}:{value}", book)
+                if changed:
+                    self._local.pending.append(record)
+                out.append((record, changed))
+        return out
+
+    def _write(
+        self,
+        conn: sqlite3.Connection,
+        kind: str,
+        value: str,
+        ident_key: str,
+        book: dict[str, Any],
+    ) -> tuple[dict[str, Any], bool]:
+        """
+        Read-merge-write of one book; the caller owns the transaction.
+        Returns (stored record, changed); an unchanged book is not written.
+        """
+        row = conn.execute(
+            "SELECT id, doc FROM books WHERE ident_key = ?", (ident_key,)
+        ).fetchone()
+        existing_id, existing = (row[0], loads(row[1])) if row else (None, None)
+        merged = merge_stored_book(book, kind, value, existing_id, existing, utc_now_iso())
+        if existing is not None and content_hash(merged) == content_hash(existing):
+            return existing, False
+        item_id = existing_id or merged["id"]
+
+        conn.execute(
+            "INSERT INTO books (id, ident_key, added_at, updated_at, doc, rev) "
+            "VALUES (?, ?, ?, ?, ?, (SELECT COALESCE(MAX(rev), 0) + 1 FROM books)) "
+            "ON CONFLICT(id) DO UPDATE SET ident_key = excluded.ident_key, "
+            "updated_at = excluded.updated_at, doc = excluded.doc, rev = excluded.rev",
+            (item_id, ident_key, merged["added_at"], merged["updated_at"],
+             dumps(merged, pretty=False)),
+        )
+        return merged, True